@@ -0,0 +1 @@
+# Benchmarks are run from the repository root, e.g. python3 -m benchmarks.bench_inline
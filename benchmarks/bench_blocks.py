@@ -0,0 +1,81 @@
+import re
+import sys
+import time
+
+from benchmarks.corpus import generate_markdown
+from src.markdown_to_html import (
+    BlockType,
+    block_to_children,
+    classify_block,
+    configure_inline_memo,
+    markdown_to_blocks,
+)
+
+
+def regex_block_to_blocktype(block):
+    lines = block.split("\n")
+    if re.match(r"^#{1,6} ", block):
+        return BlockType.HEADING
+    if block.startswith("```") and block.endswith("```"):
+        return BlockType.CODE
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith("- ") for line in lines):
+        return BlockType.UNORDERED_LIST
+    for i, line in enumerate(lines):
+        if not line.startswith(f"{i + 1}. "):
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
+
+
+def regex_classify_and_derive(block):
+    blocktype = regex_block_to_blocktype(block)
+    if blocktype == BlockType.HEADING:
+        return blocktype, len(re.match(r"^(#+) ", block).group(1)), None
+    if blocktype == BlockType.QUOTE:
+        return blocktype, 0, [line[1:].strip() for line in block.split("\n")]
+    if blocktype == BlockType.UNORDERED_LIST:
+        return blocktype, 0, [line[2:] for line in block.split("\n")]
+    if blocktype == BlockType.ORDERED_LIST:
+        lines = block.split("\n")
+        return blocktype, 0, [re.match(r"^\d+\. (.+)", l).group(1) for l in lines]
+    return blocktype, 0, None
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1000:9.1f} ms")
+    return elapsed
+
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    blocks = []
+    seed = 0
+    while len(blocks) < target:
+        blocks.extend(markdown_to_blocks(generate_markdown("mixed", 1 << 20, seed)))
+        seed += 1
+    blocks = blocks[:target]
+    print(f"{len(blocks)} blocks, {sum(map(len, blocks)) / 1e6:.1f} MB")
+
+    for block in blocks:
+        assert regex_block_to_blocktype(block) == classify_block(block)[0]
+
+    before = timed(
+        "regex classify + re-derive",
+        lambda: [regex_classify_and_derive(b) for b in blocks],
+    )
+    after = timed(
+        "dispatch classification", lambda: [classify_block(b) for b in blocks]
+    )
+    print(f"{'classification speedup':<32} {before / after:9.1f}x")
+    configure_inline_memo(0)
+    timed(
+        "block_to_children (no memo)", lambda: [block_to_children(b) for b in blocks]
+    )
+
+
+if __name__ == "__main__":
+    main()
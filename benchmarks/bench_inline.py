@@ -0,0 +1,60 @@
+import random
+import timeit
+
+from src.markdown_to_html import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+from src.textnode import TextNode, TextType
+
+
+def chained_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    delimiters = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+    for delimiter, text_type in delimiters.items():
+        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+    nodes = split_nodes_image(nodes)
+    return split_nodes_link(nodes)
+
+
+def link_dense_paragraph(rng, count):
+    parts = []
+    for i in range(count):
+        if rng.random() < 0.2:
+            parts.append(f"![figure {i}](/images/fig{i}.png)")
+        else:
+            parts.append(f"[reference {i}](https://example.com/page{i})")
+        parts.append(" see also ")
+    return "".join(parts)
+
+
+def emphasis_dense_paragraph(rng, count):
+    styles = ["**bold {}**", "_italic {}_", "`code{}`", "plain {}"]
+    return " ".join(rng.choice(styles).format(i) for i in range(count))
+
+
+def bench(name, text, number):
+    chained = timeit.timeit(lambda: chained_text_to_textnodes(text), number=number)
+    scanner = timeit.timeit(lambda: text_to_textnodes(text), number=number)
+    print(
+        f"{name:<24} {len(text):>8} chars  chained {chained / number * 1000:8.3f} ms"
+        f"  scanner {scanner / number * 1000:8.3f} ms  speedup {chained / scanner:5.1f}x"
+    )
+
+
+def main():
+    rng = random.Random(42)
+    for count in (50, 500, 5000, 20000):
+        text = link_dense_paragraph(rng, count)
+        assert chained_text_to_textnodes(text) == text_to_textnodes(text)
+        bench(f"link-dense x{count}", text, max(1, 2000 // count))
+    for count in (50, 500, 2000):
+        text = emphasis_dense_paragraph(rng, count)
+        assert chained_text_to_textnodes(text) == text_to_textnodes(text)
+        bench(f"emphasis-dense x{count}", text, max(1, 2000 // count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import gc
+import resource
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate_markdown
+from src.markdown_to_html import markdown_to_html_node
+
+
+def render(markdown):
+    node = markdown_to_html_node(markdown)
+    return node, node.to_html()
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10 * 1024 * 1024
+    markdown = generate_markdown("mixed", size)
+    print(f"markdown size: {len(markdown) / 1024 / 1024:.1f} MB")
+
+    gc.collect()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    node, html = render(markdown)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"render time:   {elapsed:.2f} s")
+    print(f"peak RSS:      {rss_after / 1024:.1f} MB (+{(rss_after - rss_before) / 1024:.1f} MB)")
+    del node, html
+    gc.collect()
+
+    tracemalloc.start()
+    node, html = render(markdown)
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    print(f"traced peak:   {peak / 1024 / 1024:.1f} MB")
+    print(f"tree retained: {current / 1024 / 1024:.1f} MB in {blocks} live allocations")
+
+
+if __name__ == "__main__":
+    main()
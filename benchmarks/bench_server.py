@@ -0,0 +1,109 @@
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.corpus import generate_markdown, write_corpus
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css">{{ Content }}'
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def start_server(root, jobs):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src", "serve", "--port", "0", "--quiet"]
+        + ["--jobs", str(jobs), "--no-cache"]
+        + ["--template", os.path.join(root, "template.html")]
+        + ["--content", os.path.join(root, "content")],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = process.stdout.readline()
+    host, port = line.rsplit("/", 1)[1].strip().split(":")
+    return process, host, int(port)
+
+
+def run_client(host, port, requests, latencies):
+    connection = http.client.HTTPConnection(host, port)
+    for method, path, body in requests:
+        start = time.perf_counter()
+        connection.request(method, path, body)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path}: {response.status}")
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the render server")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=8 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, "template.html"), "w") as f:
+            f.write(TEMPLATE)
+        content = os.path.join(root, "content")
+        paths = write_corpus(content, 50, 2, "mixed", args.page_size, seed=1)
+        markdown = generate_markdown("mixed", args.page_size, seed=2).encode()
+        requests = []
+        for i in range(args.requests):
+            if i % 2:
+                relative = os.path.relpath(paths[i % len(paths)], content)
+                requests.append(("GET", f"/render?path={relative}", None))
+            else:
+                requests.append(("POST", "/render", markdown))
+
+        process, host, port = start_server(root, args.jobs)
+        try:
+            latencies = []
+            clients = [
+                threading.Thread(
+                    target=run_client,
+                    args=(host, port, requests[i :: args.concurrency], latencies),
+                )
+                for i in range(args.concurrency)
+            ]
+            start = time.perf_counter()
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            process.terminate()
+            process.wait()
+
+        spawned = []
+        page = paths[0]
+        for _ in range(10):
+            begin = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "src", "render", page, "-o", os.devnull],
+                check=True,
+            )
+            spawned.append(time.perf_counter() - begin)
+
+    print(f"{len(latencies)} requests, {args.concurrency} clients, {args.jobs} job(s)")
+    print(f"throughput  {len(latencies) / elapsed:8.0f} req/s")
+    print(f"p50         {percentile(latencies, 0.50) * 1000:8.2f} ms")
+    print(f"p99         {percentile(latencies, 0.99) * 1000:8.2f} ms")
+    spawn = statistics.median(spawned) * 1000
+    print(f"spawn p50   {spawn:8.2f} ms (python -m src render per request)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate_markdown
+
+
+def import_times(args):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = int(cumulative_us)
+    return times
+
+
+def wall_time(args, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as root:
+        page = os.path.join(root, "page.md")
+        with open(page, "w") as f:
+            f.write(generate_markdown("mixed", 16 * 1024))
+        commands = {
+            "interpreter": ["-c", "pass"],
+            "python -m src render": ["-m", "src", "render", page, "-o", os.devnull],
+            "import src.main": ["-c", "import src.main"],
+        }
+        for label, args in commands.items():
+            print(f"{label:<24} {wall_time(args, repeat) * 1000:8.1f} ms")
+
+        times = import_times(commands["python -m src render"])
+        print("\nslowest imports on the render path (cumulative):")
+        for name, us in sorted(times.items(), key=lambda item: -item[1])[:10]:
+            print(f"  {name:<32} {us / 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
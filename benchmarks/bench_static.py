@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from src.staticcontent import copy_static_to_public
+
+
+def serial_copy(src, dst):
+    for item in os.listdir(src):
+        src_path = os.path.join(src, item)
+        dst_path = os.path.join(dst, item)
+        if os.path.isfile(src_path):
+            shutil.copy2(src_path, dst_path)
+        elif os.path.isdir(src_path):
+            os.makedirs(dst_path, exist_ok=True)
+            serial_copy(src_path, dst_path)
+
+
+def make_tree(root, small_files, large_files, large_size):
+    per_dir = 500
+    for i in range(small_files):
+        directory = os.path.join(root, "assets", f"d{i // per_dir}")
+        if i % per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"f{i}.svg"), "wb") as f:
+            f.write(os.urandom(256 + i % 2048))
+    os.makedirs(os.path.join(root, "media"), exist_ok=True)
+    for i in range(large_files):
+        with open(os.path.join(root, "media", f"video{i}.mp4"), "wb") as f:
+            f.write(os.urandom(large_size))
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    print(f"{label:<28} {time.perf_counter() - start:8.2f} s")
+
+
+def main():
+    small_files = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    large_files = 4
+    large_size = 64 << 20
+    with tempfile.TemporaryDirectory() as root:
+        src = os.path.join(root, "static")
+        make_tree(src, small_files, large_files, large_size)
+        print(f"{small_files} small files + {large_files} x {large_size >> 20} MB")
+
+        serial_dst = os.path.join(root, "serial")
+        os.makedirs(serial_dst)
+        timed("serial listdir + copy2", lambda: serial_copy(src, serial_dst))
+
+        dst = os.path.join(root, "docs")
+        timed("scandir + thread pool", lambda: copy_static_to_public(src, dst))
+        timed(
+            "no-op sync",
+            lambda: copy_static_to_public(src, dst, clean=False, previous=()),
+        )
+
+
+if __name__ == "__main__":
+    main()
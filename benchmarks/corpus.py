@@ -0,0 +1,95 @@
+import os
+import random
+
+WORDS = [
+    "static", "site", "generator", "markdown", "template", "render", "page",
+    "build", "python", "node", "block", "inline", "heading", "list", "quote",
+]
+
+
+def _words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _link_heavy_block(rng, i):
+    parts = []
+    for n in range(rng.randint(10, 40)):
+        if rng.random() < 0.2:
+            parts.append(f"![figure {n}](/images/{i}/{n}.png)")
+        else:
+            parts.append(f"[{_words(rng, 2)}](https://example.com/{i}/{n})")
+        parts.append(_words(rng, rng.randint(1, 4)))
+    return " ".join(parts)
+
+
+def _list_heavy_block(rng, i):
+    count = rng.randint(5, 60)
+    if rng.random() < 0.5:
+        return "\n".join(f"- {_words(rng, 4)} **{i}.{n}**" for n in range(count))
+    return "\n".join(f"{n + 1}. {_words(rng, 4)} _{n}_" for n in range(count))
+
+
+def _code_heavy_block(rng, i):
+    lines = [
+        f"    value_{n} = compute({n}, '{_words(rng, 2)}')  # **not** bold"
+        for n in range(rng.randint(200, 2000))
+    ]
+    return "```\n" + "\n".join(lines) + "\n```"
+
+
+def _mixed_block(rng, i):
+    kind = rng.randrange(5)
+    if kind == 0:
+        return f"## Section {i}"
+    if kind == 1:
+        return "\n".join(
+            f"- item **{i}.{n}** with [link](/ref/{n}) and `code`"
+            for n in range(rng.randint(3, 12))
+        )
+    if kind == 2:
+        return "\n".join(
+            f"{n + 1}. step _{n}_ see ![img](/images/{n}.png)"
+            for n in range(rng.randint(3, 8))
+        )
+    if kind == 3:
+        return "> quoted text " * rng.randint(1, 5)
+    return " ".join(
+        rng.choice(["plain", "**bold**", "_it_", "`x`", "[a](/b)", "words"])
+        for _ in range(rng.randint(20, 80))
+    )
+
+
+SHAPES = {
+    "mixed": _mixed_block,
+    "link_heavy": _link_heavy_block,
+    "list_heavy": _list_heavy_block,
+    "code_heavy": _code_heavy_block,
+}
+
+
+def generate_markdown(shape, size, seed=0, title=None):
+    rng = random.Random(f"{shape}:{seed}")
+    make_block = SHAPES[shape]
+    blocks = [f"# {title or shape.replace('_', ' ') + f' corpus {seed}'}"]
+    total = len(blocks[0])
+    i = 0
+    while total < size:
+        block = make_block(rng, i)
+        blocks.append(block)
+        total += len(block) + 2
+        i += 1
+    return "\n\n".join(blocks)
+
+
+def write_corpus(root, pages, depth=1, shape="mixed", page_size=4096, seed=0):
+    paths = []
+    for n in range(pages):
+        directory = root
+        for level in range(depth):
+            directory = os.path.join(directory, f"d{level}_{(n >> level) % 4}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"page{n}.md")
+        with open(path, "w") as f:
+            f.write(generate_markdown(shape, page_size, seed + n, f"Page {n}"))
+        paths.append(path)
+    return paths
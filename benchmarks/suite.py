@@ -0,0 +1,188 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate_markdown, write_corpus
+from src.main import generate_pages
+from src.markdown_to_html import (
+    block_to_blocktype,
+    configure_inline_memo,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    text_to_textnodes,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css">{{ Content }}'
+
+
+def measure(fn, repeat):
+    gc.collect()
+    best = float("inf")
+    for _ in range(repeat):
+        configure_inline_memo()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    configure_inline_memo()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def markdown_cases(size):
+    cases = {}
+    for shape in ("mixed", "link_heavy", "list_heavy", "code_heavy"):
+        markdown = generate_markdown(shape, size)
+        cases[f"markdown_to_html_node/{shape}"] = (
+            lambda markdown=markdown: markdown_to_html_node(markdown).to_html(),
+            len(markdown.encode()),
+            None,
+        )
+
+    markdown = generate_markdown("link_heavy", size)
+    paragraphs = [
+        block.replace("\n", " ") for block in markdown_to_blocks(markdown)[1:]
+    ]
+    cases["text_to_textnodes/link_heavy"] = (
+        lambda: [text_to_textnodes(text) for text in paragraphs],
+        sum(len(text.encode()) for text in paragraphs),
+        None,
+    )
+
+    blocks = markdown_to_blocks(generate_markdown("list_heavy", size))
+    cases["block_to_blocktype/list_heavy"] = (
+        lambda: [block_to_blocktype(block) for block in blocks],
+        sum(len(block.encode()) for block in blocks),
+        None,
+    )
+    return cases
+
+
+def site_case(root, pages, depth):
+    content = os.path.join(root, "content")
+    paths = write_corpus(content, pages, depth=depth)
+    template = os.path.join(root, "template.html")
+    with open(template, "w") as f:
+        f.write(TEMPLATE)
+    total = sum(os.path.getsize(path) for path in paths)
+    dest = os.path.join(root, "docs")
+    os.makedirs(dest, exist_ok=True)
+
+    def build():
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages(content, template, dest, "/")
+
+    return {f"generate_pages/depth{depth}": (build, total, pages)}
+
+
+def run(size, pages, depth, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        cases = markdown_cases(size)
+        cases.update(site_case(root, pages, depth))
+        for name, (fn, nbytes, npages) in cases.items():
+            seconds, peak = measure(fn, repeat)
+            result = {
+                "seconds": seconds,
+                "mb_per_s": nbytes / seconds / 1e6,
+                "peak_mb": peak / 1e6,
+            }
+            if npages:
+                result["pages_per_s"] = npages / seconds
+            results[name] = result
+            rate = f"  {result['pages_per_s']:9.1f} pages/s" if npages else ""
+            print(
+                f"{name:<36} {seconds * 1000:9.1f} ms  {result['mb_per_s']:7.2f} MB/s"
+                f"  peak {result['peak_mb']:7.1f} MB{rate}"
+            )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if result["seconds"] > previous["seconds"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {previous['seconds'] * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms"
+            )
+        if previous["peak_mb"] >= 1 and result["peak_mb"] > previous["peak_mb"] * (
+            1 + tolerance
+        ):
+            regressions.append(
+                f"{name}: peak {previous['peak_mb']:.1f} MB -> {result['peak_mb']:.1f} MB"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the markdown pipeline")
+    parser.add_argument("--size", type=int, default=1 << 20, help="bytes per document")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    parameters = {
+        "size": args.size,
+        "pages": args.pages,
+        "depth": args.depth,
+        "repeat": args.repeat,
+    }
+    if not args.update_baseline:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --update-baseline")
+            return 0
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # timings only compare against a baseline measured on the same corpus
+        if baseline.get("parameters") != parameters:
+            print(
+                f"Baseline at {args.baseline} was recorded with "
+                f"{baseline.get('parameters')}, not {parameters}; rerun with "
+                "matching options or --update-baseline"
+            )
+            return 2
+
+    results = run(args.size, args.pages, args.depth, args.repeat)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {"parameters": parameters, "results": results},
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        print(f"Wrote baseline to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"Performance regressions beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
 #!/bin/bash
-python3 src/main.py
-cd docs && python3 -m http.server 8080
\ No newline at end of file
+python3 -m http.server 8080 --directory docs &
+trap "kill $!" EXIT
+python3 src/main.py --watch
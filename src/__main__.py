@@ -0,0 +1,20 @@
+import sys
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["render"]:
+        from .render import main as render
+
+        return render(argv[1:])
+    if argv[:1] == ["serve"]:
+        from .server import main as serve
+
+        return serve(argv[1:])
+    from .main import main as build
+
+    return build(argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import gzip
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_COMPRESS_SIZE = 256
+INCOMPRESSIBLE_EXTENSIONS = frozenset(
+    """
+    .png .jpg .jpeg .gif .webp .avif .ico .mp3 .mp4 .m4a .ogg .webm .mov
+    .woff .woff2 .zip .gz .br .zst .xz .bz2 .7z .pdf
+    """.split()
+)
+MAX_PENDING = 64
+SIDECAR_SUFFIXES = (".gz", ".zst", ".br")
+
+CODECS = {"gzip": (".gz", lambda data: gzip.compress(data, 9, mtime=0))}
+if zstd:
+    CODECS["zstd"] = (".zst", lambda data: zstd.compress(data, 19))
+if brotli:
+    CODECS["br"] = (".br", lambda data: brotli.compress(data, quality=11))
+
+
+def is_compressible(path):
+    return os.path.splitext(path)[1].lower() not in INCOMPRESSIBLE_EXTENSIONS
+
+
+def remove_sidecars(path):
+    for suffix in SIDECAR_SUFFIXES:
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def write_sidecars(path, data, formats):
+    if not is_compressible(path):
+        return 0
+    if data is None:
+        with open(path, "rb") as f:
+            data = f.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        remove_sidecars(path)
+        return 0
+    written = 0
+    for name in formats:
+        suffix, compress = CODECS[name]
+        sidecar = path + suffix
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+            continue
+        tmp_path = f"{sidecar}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, sidecar)
+        written += 1
+    return written
+
+
+class Compressor:
+    def __init__(self, formats=("gzip",), workers=None):
+        for name in formats:
+            if name not in CODECS:
+                raise ValueError(f"Unsupported compression format: {name}")
+        self.formats = tuple(formats)
+        self.workers = workers
+        self.files = 0
+        self.sidecars = 0
+        self._pool = None
+        self._futures = deque()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Compressor({self.formats}, {self.workers})"
+
+    def __getstate__(self):
+        return {"formats": self.formats, "workers": self.workers}
+
+    def __setstate__(self, state):
+        self.__init__(state["formats"], state["workers"])
+
+    def submit(self, path, data=None):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+            if len(self._futures) >= MAX_PENDING:
+                self._collect(self._futures.popleft())
+            self._futures.append(
+                self._pool.submit(write_sidecars, path, data, self.formats)
+            )
+
+    def _collect(self, future):
+        written = future.result()
+        if written:
+            self.files += 1
+            self.sidecars += written
+
+    def wait(self):
+        with self._lock:
+            while self._futures:
+                self._collect(self._futures.popleft())
+        return self.files, self.sidecars
@@ -0,0 +1,144 @@
+import json
+import os
+import posixpath
+import re
+
+try:
+    from .markdown_to_html import IMAGE_PATTERN, LINK_PATTERN, iter_blocks
+except ImportError:
+    from markdown_to_html import IMAGE_PATTERN, LINK_PATTERN, iter_blocks
+
+GRAPH_VERSION = 1
+BASEPATH_INPUT = "@basepath"
+EXTERNAL_PATTERN = re.compile(r"^([a-zA-Z][a-zA-Z0-9+.-]*:|//|#)")
+
+
+def scan_references(lines):
+    references = []
+    for block in iter_blocks(lines):
+        if block.startswith("```"):
+            continue
+        references.extend(("image", url) for _, url in IMAGE_PATTERN.findall(block))
+        references.extend(("link", url) for _, url in LINK_PATTERN.findall(block))
+    return references
+
+
+def scan_file_references(path):
+    with open(path, encoding="utf-8") as md:
+        return scan_references(md)
+
+
+def resolve_reference(url, from_path, content_dir, static_dir):
+    url = url.split("#", 1)[0].split("?", 1)[0].strip()
+    if not url or EXTERNAL_PATTERN.match(url):
+        return None, True
+
+    if url.startswith("/"):
+        target = posixpath.normpath(url.lstrip("/") or ".")
+    else:
+        page_dir = os.path.dirname(os.path.relpath(from_path, content_dir))
+        target = posixpath.normpath(posixpath.join(page_dir.replace(os.sep, "/"), url))
+    if target.startswith(".."):
+        return None, False
+    target = "" if target == "." else target
+
+    candidates = [os.path.join(static_dir, target)] if target else []
+    stem = target[:-5] if target.endswith(".html") else target
+    candidates += [
+        os.path.join(content_dir, f"{stem}.md"),
+        os.path.join(content_dir, stem, "index.md"),
+    ]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return os.path.normpath(candidate), True
+    return None, False
+
+
+class DependencyGraph:
+    def __init__(self, path=None):
+        self.path = path
+        self.basepath = None
+        self.outputs = {}
+        self.dependents = {}
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError:
+                    data = {}
+            if data.get("version") == GRAPH_VERSION:
+                self.basepath = data.get("basepath")
+                for dest_path, entry in data.get("outputs", {}).items():
+                    self._add(dest_path, entry)
+
+    def _add(self, dest_path, entry):
+        self.outputs[dest_path] = entry
+        for input_path in entry["inputs"]:
+            self.dependents.setdefault(input_path, set()).add(dest_path)
+
+    def remove(self, dest_path):
+        entry = self.outputs.pop(dest_path, None)
+        if not entry:
+            return
+        for input_path in entry["inputs"]:
+            dependents = self.dependents.get(input_path)
+            if dependents:
+                dependents.discard(dest_path)
+                if not dependents:
+                    del self.dependents[input_path]
+
+    def record(
+        self, dest_path, source_path, template_path, references, resolve, source_hash=None
+    ):
+        inputs = {
+            os.path.normpath(source_path),
+            os.path.normpath(template_path),
+            BASEPATH_INPUT,
+        }
+        for _, url in references:
+            target, _ = resolve(url, source_path)
+            if target:
+                inputs.add(target)
+        self.remove(dest_path)
+        self._add(
+            dest_path,
+            {
+                "source": source_path,
+                "hash": source_hash,
+                "inputs": sorted(inputs),
+                "references": [list(reference) for reference in references],
+            },
+        )
+
+    def set_basepath(self, basepath):
+        changed = self.basepath is not None and basepath != self.basepath
+        self.basepath = basepath
+        return self.affected([BASEPATH_INPUT]) if changed else set()
+
+    def affected(self, input_paths):
+        outputs = set()
+        for input_path in input_paths:
+            outputs |= self.dependents.get(os.path.normpath(input_path), set())
+        return outputs
+
+    def broken_references(self, resolve):
+        broken = {}
+        for entry in self.outputs.values():
+            for kind, url in entry["references"]:
+                _, ok = resolve(url, entry["source"])
+                if not ok:
+                    broken.setdefault(entry["source"], []).append((kind, url))
+        return broken
+
+    def save(self, path=None):
+        path = path or self.path
+        data = {
+            "version": GRAPH_VERSION,
+            "basepath": self.basepath,
+            "outputs": self.outputs,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
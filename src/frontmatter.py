@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+HEADER_SIZE = 4096
+MAX_HEADER_SIZE = 64 << 10
+FRONT_MATTER_SEPARATORS = {b"---": ":", b"+++": "="}
+BOOLEANS = {"true": True, "yes": True, "false": False, "no": False}
+
+
+def parse_date(value):
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _parse_value(key, value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        value = value[1:-1]
+    if key == "draft":
+        if value.lower() not in BOOLEANS:
+            raise ValueError(f"draft must be true or false, got {value!r}")
+        return BOOLEANS[value.lower()]
+    if key == "date":
+        try:
+            parse_date(value)
+        except ValueError:
+            raise ValueError(f"invalid date {value!r}") from None
+    elif key == "slug":
+        if not value or "/" in value or "\\" in value or value.startswith("."):
+            raise ValueError(f"invalid slug {value!r}")
+    return value
+
+
+def parse_front_matter(text, separator=":"):
+    meta = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, found, value = line.partition(separator)
+        if not found:
+            raise ValueError(f"invalid front matter line {line!r}")
+        key = key.strip().lower()
+        meta[key] = _parse_value(key, value.strip())
+    return meta
+
+
+def _is_delimiter(buffer, start, delimiter):
+    end = start + len(delimiter)
+    return buffer[start:end] == delimiter and buffer[end : end + 1] in (
+        b"",
+        b"\n",
+        b"\r",
+    )
+
+
+def split_front_matter(buffer, complete=True):
+    delimiter = buffer[:3]
+    separator = FRONT_MATTER_SEPARATORS.get(delimiter)
+    if separator is None or not _is_delimiter(buffer, 0, delimiter):
+        return {}, 0
+
+    start = buffer.find(b"\n") + 1
+    position = start - 1 if start else -1
+    while position >= 0:
+        position = buffer.find(b"\n" + delimiter, position)
+        if position < 0 or _is_delimiter(buffer, position + 1, delimiter):
+            break
+        position += 1
+    if position < 0:
+        if not complete:
+            return None
+        raise ValueError("unterminated front matter")
+
+    end = buffer.find(b"\n", position + 1)
+    offset = len(buffer) if end < 0 else end + 1
+    header = buffer[start:position].decode("utf-8")
+    return parse_front_matter(header, separator), offset
+
+
+def read_front_matter(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        while True:
+            found = split_front_matter(header, complete=False)
+            if found is not None:
+                return found[0]
+            if len(header) >= MAX_HEADER_SIZE:
+                raise ValueError(f"front matter is over {MAX_HEADER_SIZE} bytes")
+            more = f.read(len(header))
+            if not more:
+                return split_front_matter(header)[0]
+            header += more
@@ -1,7 +1,6 @@
-from enum import Enum
-
-
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -14,6 +13,12 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError()
 
+    def iter_html(self):
+        yield self.to_html()
+
+    def write_html(self, fp):
+        fp.writelines(self.iter_html())
+
     def props_to_html(self):
         if not self.props:
             return ""
@@ -27,6 +32,8 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, children=None, props=props)
 
@@ -41,12 +48,31 @@ class LeafNode(HTMLNode):
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, value=None, children=children, props=props)
 
     def to_html(self):
-        if not self.tag:
-            raise ValueError("parentnode lacks tag")
-        if not self.children:
-            raise ValueError("parentnode lacks child")
-        return f"<{self.tag}{self.props_to_html()}>{''.join(child.to_html() for child in self.children)}</{self.tag}>"
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        stack = [iter((self,))]
+        closing_tags = []
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                if closing_tags:
+                    yield closing_tags.pop()
+                continue
+            if not isinstance(node, ParentNode):
+                yield node.to_html()
+                continue
+            if not node.tag:
+                raise ValueError("parentnode lacks tag")
+            if not node.children:
+                raise ValueError("parentnode lacks child")
+            yield f"<{node.tag}{node.props_to_html()}>"
+            closing_tags.append(f"</{node.tag}>")
+            stack.append(iter(node.children))
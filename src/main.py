@@ -1,51 +1,226 @@
+import argparse
+import io
 import os
-import sys
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 
 try:
-    from .markdown_to_html import markdown_to_html_node
-    from .staticcontent import copy_static_to_public
+    from .compress import CODECS, Compressor, remove_sidecars
+    from .manifest import BuildManifest, hash_bytes, hash_file
+    from .depgraph import (
+        DependencyGraph,
+        resolve_reference,
+        scan_file_references,
+    )
+    from .htmlnode import ParentNode
+    from .markdown_to_html import (
+        INLINE_MEMO_SIZE,
+        configure_inline_memo,
+        inline_memo_stats,
+    )
+    from .profiler import NULL_PAGE_PROFILE, BuildProfile, PageProfile
+    from .frontmatter import read_front_matter
+    from .render import extract_title, read_page
+    from .render_cache import DEFAULT_CACHE_SIZE, CachedContent, RenderCache
+    from .search import SEARCH_DIR, PageText, SearchIndex
+    from .sitemodel import FEED_NAME, INDEX_PAGE, SITEMAP_NAME, SiteModel
+    from .shard import (
+        SHARD_STRATEGIES,
+        merge_shards,
+        parse_shard,
+        select_shard,
+        shard_manifest_path,
+    )
+    from .sourcefile import map_source
+    from .staticcontent import copy_static_to_public, sync_static_file
+    from .template import load_template
+    from .watch import open_watcher
 except ImportError:
-    from markdown_to_html import markdown_to_html_node
-    from staticcontent import copy_static_to_public
+    from compress import CODECS, Compressor, remove_sidecars
+    from manifest import BuildManifest, hash_bytes, hash_file
+    from depgraph import (
+        DependencyGraph,
+        resolve_reference,
+        scan_file_references,
+    )
+    from htmlnode import ParentNode
+    from markdown_to_html import (
+        INLINE_MEMO_SIZE,
+        configure_inline_memo,
+        inline_memo_stats,
+    )
+    from profiler import NULL_PAGE_PROFILE, BuildProfile, PageProfile
+    from frontmatter import read_front_matter
+    from render import extract_title, read_page
+    from render_cache import DEFAULT_CACHE_SIZE, CachedContent, RenderCache
+    from search import SEARCH_DIR, PageText, SearchIndex
+    from sitemodel import FEED_NAME, INDEX_PAGE, SITEMAP_NAME, SiteModel
+    from shard import (
+        SHARD_STRATEGIES,
+        merge_shards,
+        parse_shard,
+        select_shard,
+        shard_manifest_path,
+    )
+    from sourcefile import map_source
+    from staticcontent import copy_static_to_public, sync_static_file
+    from template import load_template
+    from watch import open_watcher
 
 
-def extract_title(markdown):
-    lines = markdown.splitlines()
-    for line in lines:
-        if line.startswith("# "):
-            return line[2:].strip()
-    raise Exception("No title found in markdown")
+def _write_file(dest_path, write, mode="w"):
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(tmp_path, mode) as page:
+            write(page)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
-def generate_pages(content_path, template_path, dest_path, basepath):
-    if os.path.isfile(content_path):
-        if content_path.endswith(".md"):
-            print(
-                f"Generating page from {content_path} to {dest_path} using {template_path}..."
-            )
+def _write_page(dest_path, write, compressor=None):
+    if not compressor:
+        _write_file(dest_path, write)
+        remove_sidecars(dest_path)
+        return
+    page = io.StringIO()
+    write(page)
+    data = page.getvalue().encode("utf-8")
+    _write_file(dest_path, lambda f: f.write(data), "wb")
+    compressor.submit(dest_path, data)
+
+
+def _fill_page(dest_path, template, title, contents, compressor=None, variables=None):
+    variables = {**(variables or {}), "Title": title, "Content": contents}
+    _write_page(dest_path, lambda page: template.write(page, variables), compressor)
+
+
+def _profiled_blocks(blocks, profile):
+    for block in blocks:
+        profile.mark("markdown_to_blocks", 1)
+        yield block
+    profile.mark("markdown_to_blocks")
+
+
+def _profiled_nodes(nodes, profile):
+    profile.mark("template_fill")
+    for node in nodes:
+        profile.mark("block_to_children")
+        yield node
+        profile.mark("to_html")
+
+
+def generate_page(
+    from_path,
+    template,
+    dest_path,
+    profile=NULL_PAGE_PROFILE,
+    cache=None,
+    compressor=None,
+    text=None,
+    variables=None,
+):
+    with map_source(from_path) as md:
+        source_hash = hash_bytes(md)
+        profile.mark("read", len(md))
+        cached = cache.get(source_hash) if cache else None
+        if cache:
+            profile.mark("cache", 1 if cached else 0)
+        if cached:
+            title, contents = cached
+            if text is not None:
+                text.add_title(title)
+                text.add_html(contents)
+                profile.mark("index")
+            _fill_page(dest_path, template, title, contents, compressor, variables)
+            profile.mark("write", len(contents))
+            return source_hash
+
+        profiling = profile is not NULL_PAGE_PROFILE
+        wrap_blocks = (
+            (lambda blocks: _profiled_blocks(blocks, profile)) if profiling else None
+        )
+        _, title, nodes = read_page(md, wrap_blocks)
+        profile.mark("extract_title")
+        if text is not None:
+            text.add_title(title)
+            nodes = text.watch(nodes)
+        if profiling:
+            nodes = _profiled_nodes(nodes, profile)
+        contents = ParentNode("div", nodes)
+        if not cache:
+            _fill_page(dest_path, template, title, contents, compressor, variables)
+            profile.mark("write")
+            return source_hash
+
+        with cache.open_entry(source_hash, title) as cache_fp:
+            contents = CachedContent(contents, cache_fp)
+            _fill_page(dest_path, template, title, contents, compressor, variables)
+        profile.mark("write")
+    return source_hash
+
+
+def render_source(source, template, cache=None, text=None):
+    source_hash = hash_bytes(source)
+    cached = cache.get(source_hash) if cache else None
+    if cached:
+        title, contents = cached
+        if text is not None:
+            text.add_title(title)
+            text.add_html(contents)
+    else:
+        _, title, nodes = read_page(source)
+        if text is not None:
+            text.add_title(title)
+            nodes = text.watch(nodes)
+        contents = ParentNode("div", nodes).to_html()
+        if cache:
+            with cache.open_entry(source_hash, title) as cache_fp:
+                cache_fp.write(contents)
+    return source_hash, template.render({"Title": title, "Content": contents})
+
 
-            with open(content_path) as md:
-                contents = md.read()
-                if not contents:
-                    raise ValueError("file empty")
+def page_dest_path(content_dir, dest_dir, from_path):
+    directory, item = os.path.split(os.path.relpath(from_path, content_dir))
+    return os.path.join(dest_dir, directory, item.replace(".md", ".html"))
 
-            with open(template_path) as tmp:
-                template = tmp.read()
-                if not template:
-                    raise ValueError("file empty")
 
-            title = extract_title(contents)
-            contents = markdown_to_html_node(contents)
+def page_output_path(dest_path, meta):
+    slug = meta.get("slug")
+    if not slug:
+        return dest_path
+    if not slug.endswith(".html"):
+        slug += ".html"
+    return os.path.join(os.path.dirname(dest_path), slug)
 
-            template = template.replace("{{ Title }}", title)
-            template = template.replace("{{ Content }}", contents.to_html())
-            template = template.replace('href="/', f'href="{basepath}')
-            template = template.replace('src="/', f'src="{basepath}')
 
-            with open(dest_path, "w") as page:
-                page.write(template)
+def page_template_path(template_path, meta):
+    name = meta.get("template")
+    if not name:
+        return template_path
+    return os.path.join(os.path.dirname(template_path), name)
 
-            print("Finished generating")
+
+def templates_in_use(manifest, template_path):
+    templates = {template_path}
+    for entry in manifest.front_matter.values():
+        templates.add(page_template_path(template_path, entry["meta"]))
+    return templates
+
+
+def page_url(dest_dir, dest_path, basepath="/"):
+    return basepath + os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+
+
+def collect_pages(content_path, dest_path):
+    pages = []
+    if os.path.isfile(content_path):
+        if content_path.endswith(".md"):
+            pages.append((content_path, dest_path))
 
     elif os.path.isdir(content_path):
         for item in os.listdir(content_path):
@@ -53,23 +228,1126 @@ def generate_pages(content_path, template_path, dest_path, basepath):
 
             if os.path.isfile(item_path) and item.endswith(".md"):
                 dest_file = item.replace(".md", ".html")
-                dest_file_path = os.path.join(dest_path, dest_file)
-                generate_pages(item_path, template_path, dest_file_path, basepath)
+                pages.append((item_path, os.path.join(dest_path, dest_file)))
             elif os.path.isdir(item_path):
                 dest_subdir = os.path.join(dest_path, item)
-                os.makedirs(dest_subdir, exist_ok=True)
-                generate_pages(item_path, template_path, dest_subdir, basepath)
+                pages.extend(collect_pages(item_path, dest_subdir))
+    return pages
+
+
+def scan_pages(pages, manifest=None, drafts=False):
+    scanned = []
+    outputs = {}
+    for from_path, to_path in pages:
+        stat = os.stat(from_path) if manifest else None
+        try:
+            if manifest:
+                meta = manifest.page_metadata(from_path, stat)
+            else:
+                meta = read_front_matter(from_path)
+        except ValueError as e:
+            raise ValueError(f"{from_path}: {e}") from None
+        if meta.get("draft") and not drafts:
+            continue
+        to_path = page_output_path(to_path, meta)
+        if to_path in outputs:
+            raise Exception(
+                f"{outputs[to_path]} and {from_path} both generate {to_path}"
+            )
+        outputs[to_path] = from_path
+        scanned.append((from_path, to_path, stat, meta))
+    return scanned
+
+
+PIPELINE_IO_WORKERS = 4
+
+_worker_templates = None
+_worker_profiling = False
+_worker_cache = None
+_worker_compressor = None
+_worker_text = None
+
+
+def _init_worker(
+    templates,
+    profiling=False,
+    cache=None,
+    memo_size=INLINE_MEMO_SIZE,
+    compressor=None,
+    text=None,
+):
+    global _worker_templates, _worker_profiling, _worker_cache, _worker_compressor
+    global _worker_text
+    _worker_templates = templates
+    _worker_profiling = profiling
+    _worker_cache = cache
+    _worker_compressor = compressor
+    _worker_text = text
+    configure_inline_memo(memo_size)
+
+
+def _render_counters(cache, compressor=None):
+    memo_hits, memo_misses = inline_memo_stats()
+    return {
+        "memo_hits": memo_hits,
+        "memo_misses": memo_misses,
+        "cache_hits": cache.hits if cache else 0,
+        "cache_misses": cache.misses if cache else 0,
+        "compressed_files": compressor.files if compressor else 0,
+        "compressed_sidecars": compressor.sidecars if compressor else 0,
+    }
+
+
+def _add_counters(stats, before, after):
+    for name, value in after.items():
+        stats[name] = stats.get(name, 0) + value - before[name]
+
+
+def _render_job(job):
+    from_path, dest_path, template_path = job
+    profile = PageProfile() if _worker_profiling else NULL_PAGE_PROFILE
+    text = _page_text(_worker_text)
+    before = _render_counters(_worker_cache, _worker_compressor)
+    try:
+        source_hash = generate_page(
+            from_path,
+            _worker_templates[template_path],
+            dest_path,
+            profile,
+            _worker_cache,
+            _worker_compressor,
+            text,
+        )
+        if _worker_compressor:
+            _worker_compressor.wait()
+        error = None
+    except Exception as e:
+        source_hash = None
+        error = f"{type(e).__name__}: {e}"
+    counters = {}
+    _add_counters(
+        counters, before, _render_counters(_worker_cache, _worker_compressor)
+    )
+    return source_hash, error, profile.to_dict(), counters, text
+
+
+def _read_source(job, _):
+    start = time.perf_counter()
+    with open(job[0], "rb") as md:
+        source = md.read()
+    if not source:
+        raise ValueError("file empty")
+    return source, time.perf_counter() - start
+
+
+def _render_source_job(job, value):
+    source, read_time = value
+    text = _page_text(_worker_text)
+    before = _render_counters(_worker_cache)
+    start = time.perf_counter()
+    template = _worker_templates[job[4]]
+    source_hash, html = render_source(source, template, _worker_cache, text)
+    timings = {
+        "stages": {"read": read_time, "render": time.perf_counter() - start},
+        "counts": {"read": len(source)},
+    }
+    counters = {}
+    _add_counters(counters, before, _render_counters(_worker_cache))
+    return source_hash, html, timings, counters, text
+
+
+def _write_rendered(job, value, compressor=None):
+    source_hash, html, timings, counters, text = value
+    start = time.perf_counter()
+    _write_page(job[1], lambda page: page.write(html), compressor)
+    timings["stages"]["write"] = time.perf_counter() - start
+    timings["counts"]["write"] = len(html)
+    return source_hash, timings, counters, text
+
+
+def _text_terms(search, site):
+    if search is None and site is None:
+        return None
+    return search is not None
+
+
+def _page_text(terms):
+    return None if terms is None else PageText(terms)
+
+
+def _record_text(
+    search,
+    site,
+    dest_dir,
+    basepath,
+    from_path,
+    dest_path,
+    source_hash,
+    text,
+    stat,
+    meta,
+):
+    url = page_url(dest_dir, dest_path, basepath)
+    if search is not None:
+        search.update(dest_path, url, text.title, source_hash, text.weights)
+    if site is not None:
+        site.update(
+            dest_path,
+            from_path,
+            url,
+            text.title,
+            text.summary,
+            (stat or os.stat(from_path)).st_mtime,
+            source_hash,
+            meta.get("date"),
+        )
+
+
+def _is_listing_page(job, templates):
+    _, to_path, _, _, page_template = job
+    return (
+        os.path.basename(to_path) == INDEX_PAGE
+        and "Listing" in templates[page_template].slots
+    )
+
+
+def _listing_pages(jobs, templates):
+    listing_pages = [job for job in jobs if _is_listing_page(job, templates)]
+    # deepest first, so a nested section is listed before its parent renders
+    return sorted(listing_pages, key=lambda job: -job[1].count(os.sep))
+
+
+def _listing_variables(site, job):
+    directory = os.path.dirname(job[1])
+    return {"Listing": site.listing_items(site.listing_entries(directory))}
+
+
+def _log_page(job):
+    from_path, to_path, _, _, page_template = job
+    print(f"Generating page from {from_path} to {to_path} using {page_template}...")
+
+
+def _finish_page(
+    job,
+    source_hash,
+    text,
+    timings,
+    stats,
+    manifest,
+    template_hash,
+    record_text,
+    profile,
+):
+    from_path, to_path, stat, meta, _ = job
+    stats["pages"] = stats.get("pages", 0) + 1
+    stats.setdefault("rebuilt", []).append(to_path)
+    if manifest:
+        manifest.record(from_path, to_path, source_hash, stat, template_hash)
+    if text is not None:
+        record_text(from_path, to_path, source_hash, text, stat, meta)
+    if profile:
+        profile.add_page(from_path, timings)
+    print("Finished generating")
+
+
+def _generate_pages_pipelined(
+    pending,
+    templates,
+    template_hashes,
+    manifest,
+    jobs,
+    profile,
+    cache,
+    stats,
+    memo_size,
+    compressor,
+    record_text,
+    text_terms,
+):
+    # asyncio is only imported for --pipeline builds
+    try:
+        from .pipeline import run_pipeline
+    except ImportError:
+        from pipeline import run_pipeline
+
+    failures = []
+
+    def done(job, result, error):
+        _log_page(job)
+        if error:
+            print(f"Failed generating {job[0]}: {type(error).__name__}: {error}")
+            failures.append(job[0])
+            return
+        source_hash, timings, counters, text = result
+        for name, value in counters.items():
+            stats[name] = stats.get(name, 0) + value
+        _finish_page(
+            job,
+            source_hash,
+            text,
+            timings,
+            stats,
+            manifest,
+            template_hashes.get(job[4]),
+            record_text,
+            profile,
+        )
 
+    initargs = (
+        templates,
+        profile is not None,
+        cache,
+        memo_size,
+        None,
+        text_terms,
+    )
+    if jobs > 1:
+        renderer = ProcessPoolExecutor(
+            jobs, initializer=_init_worker, initargs=initargs
+        )
+    else:
+        renderer = ThreadPoolExecutor(1, initializer=_init_worker, initargs=initargs)
+    write = partial(_write_rendered, compressor=compressor)
+    with ThreadPoolExecutor(PIPELINE_IO_WORKERS) as io_pool, renderer:
+        run_pipeline(
+            pending,
+            [
+                (_read_source, io_pool, PIPELINE_IO_WORKERS),
+                (_render_source_job, renderer, jobs),
+                (write, io_pool, PIPELINE_IO_WORKERS),
+            ],
+            done,
+        )
+    return failures
 
-def main():
+
+def generate_pages(
+    content_path,
+    template_path,
+    dest_path,
+    basepath,
+    manifest=None,
+    jobs=1,
+    profile=None,
+    cache=None,
+    stats=None,
+    memo_size=INLINE_MEMO_SIZE,
+    pipeline=False,
+    compressor=None,
+    shard=None,
+    search=None,
+    site=None,
+    drafts=False,
+):
+    if stats is None:
+        stats = {}
+    pages = collect_pages(content_path, dest_path)
+    if shard:
+        pages = select_shard(pages, *shard)
+    template_hashes = {}
+    pending = []
+    outputs = []
+    for from_path, to_path, stat, meta in scan_pages(pages, manifest, drafts):
+        outputs.append(to_path)
+        page_template = page_template_path(template_path, meta)
+        if page_template != template_path and page_template not in template_hashes:
+            template_hashes[page_template] = hash_file(page_template)
+        if (
+            manifest
+            and manifest.is_current(from_path, to_path, stat)
+            and manifest.pages[to_path].get("template")
+            == template_hashes.get(page_template)
+            and all(
+                index.is_current(to_path, manifest.pages[to_path]["hash"])
+                for index in (search, site)
+                if index is not None
+            )
+        ):
+            continue
+        pending.append((from_path, to_path, stat, meta, page_template))
+    if not pending:
+        return stats
+
+    for directory in {os.path.dirname(to_path) for _, to_path, *_ in pending}:
+        os.makedirs(directory, exist_ok=True)
+    templates = {
+        path: load_template(path, basepath)
+        for path in {page_template for *_, page_template in pending}
+    }
+    record_text = partial(_record_text, search, site, dest_path, basepath)
+    text_terms = _text_terms(search, site)
+
+    # an index page with a {{ Listing }} slot is rendered once the rest of its
+    # directory is in the site model, so it is written with its listing
+    deferred = []
+    if site is not None:
+        deferred = _listing_pages(pending, templates)
+        deferred_paths = {job[1] for job in deferred}
+        pending = [job for job in pending if job[1] not in deferred_paths]
+
+    def render(job, variables=None):
+        from_path, to_path, _, _, page_template = job
+        _log_page(job)
+        page_profile = PageProfile() if profile else NULL_PAGE_PROFILE
+        text = _page_text(text_terms)
+        source_hash = generate_page(
+            from_path,
+            templates[page_template],
+            to_path,
+            page_profile,
+            cache,
+            compressor,
+            text,
+            variables,
+        )
+        _finish_page(
+            job,
+            source_hash,
+            text,
+            page_profile.to_dict(),
+            stats,
+            manifest,
+            template_hashes.get(page_template),
+            record_text,
+            profile,
+        )
+
+    if pipeline:
+        failures = _generate_pages_pipelined(
+            pending,
+            templates,
+            template_hashes,
+            manifest,
+            jobs,
+            profile,
+            cache,
+            stats,
+            memo_size,
+            compressor,
+            record_text,
+            text_terms,
+        )
+    elif jobs > 1 and len(pending) > 1:
+        work = [(job[0], job[1], job[4]) for job in pending]
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(
+                templates,
+                profile is not None,
+                cache,
+                memo_size,
+                compressor,
+                text_terms,
+            ),
+        ) as pool:
+            results = pool.map(
+                _render_job, work, chunksize=max(1, len(work) // (jobs * 4))
+            )
+            failures = []
+            for job, result in zip(pending, results):
+                source_hash, error, timings, counters, text = result
+                for name, value in counters.items():
+                    stats[name] = stats.get(name, 0) + value
+                _log_page(job)
+                if error:
+                    print(f"Failed generating {job[0]}: {error}")
+                    failures.append(job[0])
+                    continue
+                _finish_page(
+                    job,
+                    source_hash,
+                    text,
+                    timings,
+                    stats,
+                    manifest,
+                    template_hashes.get(job[4]),
+                    record_text,
+                    profile,
+                )
+    else:
+        failures = []
+        before = _render_counters(cache)
+        for job in pending:
+            render(job)
+        _add_counters(stats, before, _render_counters(cache))
+    if failures:
+        raise Exception(f"{len(failures)} page(s) failed to generate")
+
+    if deferred:
+        site.retain(outputs)
+        before = _render_counters(cache)
+        for job in deferred:
+            render(job, _listing_variables(site, job))
+        _add_counters(stats, before, _render_counters(cache))
+    return stats
+
+
+def rebuild_changed(
+    changed,
+    removed,
+    static_dir,
+    content_dir,
+    template_path,
+    dest_dir,
+    basepath,
+    manifest,
+    compressor=None,
+    search=None,
+    site=None,
+    drafts=False,
+):
+    stats = {}
+    templates = templates_in_use(manifest, template_path)
+    changed_templates = [path for path in changed if path in templates]
+    if changed_templates:
+        if template_path in changed:
+            manifest.configure(
+                hash_file(template_path), basepath, manifest.compression
+            )
+            if site is not None:
+                site.configure(manifest.template, basepath, site.site_url)
+        # pages whose template hash no longer matches the manifest get rebuilt
+        generate_pages(
+            content_dir,
+            template_path,
+            dest_dir,
+            basepath,
+            manifest,
+            compressor=compressor,
+            search=search,
+            site=site,
+            drafts=drafts,
+            stats=stats,
+        )
+        changed = [path for path in changed if not path.endswith(".md")]
+
+    templates = {}
+    text_terms = _text_terms(search, site)
+    record_text = partial(_record_text, search, site, dest_dir, basepath)
+
+    def render(job, variables=None):
+        path, to_path, _, _, page_template = job
+        template_hash = None
+        if page_template != template_path:
+            template_hash = hash_file(page_template)
+        _log_page(job)
+        os.makedirs(os.path.dirname(to_path), exist_ok=True)
+        text = _page_text(text_terms)
+        source_hash = generate_page(
+            path,
+            templates[page_template],
+            to_path,
+            compressor=compressor,
+            text=text,
+            variables=variables,
+        )
+        _finish_page(
+            job,
+            source_hash,
+            text,
+            None,
+            stats,
+            manifest,
+            template_hash,
+            record_text,
+            None,
+        )
+
+    jobs = []
+    for path in changed + removed:
+        if path in changed_templates:
+            continue
+        if os.path.commonpath([path, static_dir]) == static_dir:
+            dst_path = sync_static_file(
+                static_dir, dest_dir, path, compressor=compressor
+            )
+            if path in removed:
+                manifest.static.discard(dst_path)
+            else:
+                manifest.static.add(dst_path)
+        elif path.endswith(".md"):
+            to_path = None
+            if path not in removed:
+                stat = os.stat(path)
+                meta = manifest.page_metadata(path, stat)
+                if drafts or not meta.get("draft"):
+                    to_path = page_dest_path(content_dir, dest_dir, path)
+                    to_path = page_output_path(to_path, meta)
+            for old_path in manifest.outputs_of(path):
+                if old_path != to_path:
+                    manifest.forget(old_path)
+                    for index in (search, site):
+                        if index is not None:
+                            index.remove(old_path)
+            if to_path is None:
+                continue
+
+            page_template = page_template_path(template_path, meta)
+            if page_template not in templates:
+                templates[page_template] = load_template(page_template, basepath)
+            jobs.append((path, to_path, stat, meta, page_template))
+
+    deferred = _listing_pages(jobs, templates) if site is not None else []
+    for job in jobs:
+        if job not in deferred:
+            render(job)
+    for job in deferred:
+        render(job, _listing_variables(site, job))
+    if search is not None:
+        write_search_index(search, dest_dir)
+    if site is not None:
+        write_site_outputs(
+            site,
+            template_path,
+            dest_dir,
+            basepath,
+            compressor,
+            stats.get("rebuilt", []),
+        )
+    if compressor:
+        compressor.wait()
+    manifest.save()
+
+
+def watch(
+    static_dir,
+    content_dir,
+    template_path,
+    dest_dir,
+    basepath,
+    manifest,
+    compressor=None,
+    search=None,
+    site=None,
+    drafts=False,
+):
+    def watched_paths():
+        templates = sorted(templates_in_use(manifest, template_path))
+        return [content_dir, static_dir, *templates]
+
+    watcher = open_watcher(watched_paths())
+    templates = ", ".join(watcher.paths[2:])
+    print(f"Watching {content_dir}, {static_dir} and {templates} for changes...")
+    try:
+        while True:
+            changed, removed = watcher.wait()
+            start = time.perf_counter()
+            try:
+                rebuild_changed(
+                    changed,
+                    removed,
+                    static_dir,
+                    content_dir,
+                    template_path,
+                    dest_dir,
+                    basepath,
+                    manifest,
+                    compressor,
+                    search,
+                    site,
+                    drafts,
+                )
+            except Exception as e:
+                print(f"Rebuild failed: {type(e).__name__}: {e}")
+                continue
+            finally:
+                watcher.set_paths(watched_paths())
+            print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms")
+    finally:
+        watcher.close()
+
+
+def write_search_index(search, dest_dir):
+    written = search.write(os.path.join(dest_dir, SEARCH_DIR))
+    search.save()
+    return written
+
+
+def _fill_listing_slot(
+    site, path, entries, template_path, basepath, templates, compressor
+):
+    source = site.pages[path]["source"]
+    page_template = page_template_path(template_path, read_front_matter(source))
+    if page_template not in templates:
+        templates[page_template] = load_template(page_template, basepath)
+    template = templates[page_template]
+    if "Listing" not in template.slots:
+        return False
+    listing = site.listing_items(entries)
+    generate_page(
+        source,
+        template,
+        path,
+        compressor=compressor,
+        variables={"Listing": listing},
+    )
+    return True
+
+
+def write_site_outputs(
+    site, template_path, dest_dir, basepath, compressor=None, rebuilt=()
+):
+    written = 0
+    rebuilt = set(rebuilt)
+    listings = site.listing_directories()
+    generated = {
+        directory: entries
+        for directory, entries in listings.items()
+        if not site.authored_index(directory)
+    }
+    for directory in set(site.listings) - set(generated):
+        path = site.listings.pop(directory)
+        if path not in site.pages and os.path.exists(path):
+            os.remove(path)
+            remove_sidecars(path)
+            print(f"Removed stale listing: {path}")
+
+    templates = {}
+    for directory, entries in sorted(listings.items()):
+        path = site.authored_index(directory)
+        if path:
+            # pages rebuilt this run were already written with their listing
+            if directory in site.dirty and path not in rebuilt:
+                if _fill_listing_slot(
+                    site, path, entries, template_path, basepath, templates, compressor
+                ):
+                    written += 1
+            continue
+
+        path = os.path.join(directory, INDEX_PAGE)
+        if directory in site.listings and directory not in site.dirty:
+            if os.path.exists(path):
+                continue
+        if template_path not in templates:
+            templates[template_path] = load_template(template_path, basepath)
+        template = templates[template_path]
+        title, contents = site.listing(directory, entries)
+        _fill_page(path, template, title, contents, compressor)
+        site.listings[directory] = path
+        written += 1
+
+    for name, render in ((SITEMAP_NAME, site.sitemap), (FEED_NAME, site.feed)):
+        path = os.path.join(dest_dir, name)
+        if site.changed or not os.path.exists(path):
+            data = render()
+            _write_page(path, lambda f: f.write(data), compressor)
+            written += 1
+    site.dirty.clear()
+    site.changed = False
+    site.save()
+    return written
+
+
+def _reference_resolver(content_dir, static_dir):
+    def resolve(url, from_path):
+        return resolve_reference(url, from_path, content_dir, static_dir)
+
+    return resolve
+
+
+def update_dependency_graph(
+    graph, manifest, rebuilt, removed, content_dir, static_dir, template_path
+):
+    resolve = _reference_resolver(content_dir, static_dir)
+    for dest_path in removed:
+        graph.remove(dest_path)
+    rebuilt = set(rebuilt)
+    for dest_path, entry in manifest.pages.items():
+        current = graph.outputs.get(dest_path)
+        meta = manifest.page_metadata(entry["source"])
+        page_template = page_template_path(template_path, meta)
+        if (
+            dest_path in rebuilt
+            or not current
+            or current["hash"] != entry["hash"]
+            or os.path.normpath(page_template) not in current["inputs"]
+        ):
+            graph.record(
+                dest_path,
+                entry["source"],
+                page_template,
+                scan_file_references(entry["source"]),
+                resolve,
+                entry["hash"],
+            )
+    return graph.broken_references(resolve)
+
+
+def check_references(graph, manifest, content_dir, static_dir, template_path, dest_dir):
+    resolve = _reference_resolver(content_dir, static_dir)
+    pages = scan_pages(collect_pages(content_dir, dest_dir), manifest)
+    for dest_path in set(graph.outputs) - {to_path for _, to_path, *_ in pages}:
+        graph.remove(dest_path)
+    for from_path, to_path, stat, meta in pages:
+        page_template = page_template_path(template_path, meta)
+        entry = manifest.pages.get(to_path)
+        current = graph.outputs.get(to_path)
+        if (
+            entry
+            and current
+            and current["hash"] == entry["hash"]
+            and os.path.normpath(page_template) in current["inputs"]
+            and manifest.is_current(from_path, to_path, stat)
+        ):
+            continue
+        graph.record(
+            to_path, from_path, page_template, scan_file_references(from_path), resolve
+        )
+    return graph.broken_references(resolve)
+
+
+def print_broken_references(broken):
+    for source_path, references in sorted(broken.items()):
+        for kind, url in references:
+            print(f"Broken {kind} in {source_path}: {url}")
+
+
+def print_build_summary(stats):
+    print(f"Generated {stats.get('pages', 0)} page(s)")
+    memo_hits = stats.get("memo_hits", 0)
+    memo_misses = stats.get("memo_misses", 0)
+    if memo_hits or memo_misses:
+        rate = memo_hits / (memo_hits + memo_misses)
+        print(f"Inline memo: {memo_hits} hits, {memo_misses} misses ({rate:.0%})")
+    cache_hits = stats.get("cache_hits", 0)
+    cache_misses = stats.get("cache_misses", 0)
+    if cache_hits or cache_misses:
+        print(f"Render cache: {cache_hits} hits, {cache_misses} misses")
+    if "search_files" in stats:
+        print(
+            f"Search index: {stats['search_pages']} page(s), "
+            f"{stats['search_files']} file(s) rewritten"
+        )
+    if "site_files" in stats:
+        print(f"Sitemap, feed and listings: {stats['site_files']} file(s) rewritten")
+    if stats.get("compressed_files"):
+        print(
+            f"Compressed {stats['compressed_files']} file(s) into "
+            f"{stats['compressed_sidecars']} sidecar(s)"
+        )
+
+
+def compression_formats(value):
+    formats = [name.strip() for name in value.split(",") if name.strip()]
+    for name in formats:
+        if name not in CODECS:
+            available = ", ".join(CODECS)
+            raise argparse.ArgumentTypeError(
+                f"unsupported compression format {name!r} (available: {available})"
+            )
+    return formats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="delete the output directory and render cache and rebuild every page",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="render pages across N worker processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--link-static",
+        action="store_true",
+        help="hardlink static files into the output instead of copying",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="build-profile.json",
+        metavar="REPORT",
+        help="time each build stage per page and write a JSON report",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".render-cache",
+        help="directory for the rendered-page cache (default: .render-cache)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE >> 20,
+        metavar="MB",
+        help="evict least recently used cache entries beyond this size",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="render every page without consulting the cache",
+    )
+    parser.add_argument(
+        "--inline-memo-size",
+        type=int,
+        default=INLINE_MEMO_SIZE,
+        metavar="N",
+        help="remember the rendered HTML of up to N inline fragments (0 disables)",
+    )
+    parser.add_argument(
+        "--affected",
+        nargs="+",
+        metavar="PATH",
+        help="list the outputs that depend on PATH (or @basepath) and exit",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="report broken image and link references without rendering",
+    )
+    parser.add_argument(
+        "--compress",
+        nargs="?",
+        const="gzip",
+        type=compression_formats,
+        metavar="FORMATS",
+        help="write precompressed sidecars next to outputs, e.g. gzip,zstd,br "
+        "(default: gzip)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap reading, rendering and writing pages in an asyncio pipeline",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="build only shard I of N of the pages; static files go with shard 1",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=SHARD_STRATEGIES,
+        default="hash",
+        help="partition pages by path hash or balance shards by file size",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        metavar="SHARD_DIR",
+        help="combine the outputs of every shard of a sharded build and exit",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="stay running and rebuild affected outputs when sources change",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a client-side search index to the output's search/ directory",
+    )
+    parser.add_argument(
+        "--drafts",
+        action="store_true",
+        help="also build pages whose front matter sets draft: true",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="write sitemap.xml, feed.xml and listing pages linking to pages "
+        "under URL; an index.md whose template has {{ Listing }} gets its "
+        "directory's listing instead",
+    )
+    args = parser.parse_args(argv)
+    if args.shard and args.watch:
+        parser.error("--watch cannot be combined with --shard")
+    if args.shard and args.search:
+        parser.error("--search cannot be combined with --shard")
+    if args.shard and args.site_url:
+        parser.error("--site-url cannot be combined with --shard")
+    return args
+
+
+def main(argv=None):
     source_directory = "static"
     destination_directory = "docs"
     content_directory = "content"
     template_path = "template.html"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+    manifest_path = ".build-manifest.json"
+    graph_path = ".build-graph.json"
+    search_path = ".search-index.json"
+    site_path = ".site-model.json"
+    args = parse_args(argv)
+    basepath = args.basepath
+    jobs = args.jobs or os.cpu_count() or 1
+
+    if args.merge:
+        merge_shards(args.merge, destination_directory, manifest_path)
+        return
+
+    shard = None
+    if args.shard:
+        shard = (*args.shard, args.shard_by)
+        manifest_path = shard_manifest_path(destination_directory, *args.shard)
+
+    if args.clean:
+        for path in (manifest_path, graph_path, search_path, site_path):
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.isdir(args.cache_dir):
+            shutil.rmtree(args.cache_dir)
+    graph = DependencyGraph(graph_path)
+
+    if args.affected:
+        for dest_path in sorted(graph.affected(args.affected)):
+            print(dest_path)
+        return
+
+    if args.check_links:
+        broken = check_references(
+            graph,
+            BuildManifest(manifest_path),
+            content_directory,
+            source_directory,
+            template_path,
+            destination_directory,
+        )
+        print_broken_references(broken)
+        print(f"{sum(map(len, broken.values()))} broken reference(s)")
+        return
+
+    manifest = BuildManifest(manifest_path)
+    compression = args.compress or []
+    recompress = sorted(compression) != manifest.compression
+    manifest.configure(hash_file(template_path), basepath, compression)
+    if shard:
+        index, count, strategy = shard
+        manifest.shard = {
+            "index": index,
+            "count": count,
+            "strategy": strategy,
+            "dest": destination_directory,
+        }
+    compressor = Compressor(compression) if compression else None
+    search = SearchIndex(search_path) if args.search else None
+    site = None
+    if args.site_url:
+        site = SiteModel(site_path)
+        site.configure(manifest.template, basepath, args.site_url)
+
+    profile = BuildProfile() if args.profile else None
+    configure_inline_memo(args.inline_memo_size)
+    cache = None
+    if not args.no_cache:
+        cache = RenderCache(args.cache_dir, args.cache_size << 20)
 
-    copy_static_to_public(source_directory, destination_directory)
-    generate_pages(content_directory, template_path, destination_directory, basepath)
+    start = time.perf_counter()
+    if shard and shard[0] != 1:
+        if args.clean and os.path.exists(destination_directory):
+            shutil.rmtree(destination_directory)
+        os.makedirs(destination_directory, exist_ok=True)
+    else:
+        manifest.static = copy_static_to_public(
+            source_directory,
+            destination_directory,
+            clean=args.clean,
+            previous=manifest.static,
+            link=args.link_static,
+            compressor=compressor,
+            refresh=recompress,
+        )
+    if profile:
+        profile.time_stage("static", start)
+    try:
+        start = time.perf_counter()
+        stats = generate_pages(
+            content_directory,
+            template_path,
+            destination_directory,
+            basepath,
+            manifest,
+            jobs,
+            profile,
+            cache,
+            memo_size=args.inline_memo_size,
+            pipeline=args.pipeline,
+            compressor=compressor,
+            shard=shard,
+            search=search,
+            site=site,
+            drafts=args.drafts,
+        )
+        if profile:
+            profile.time_stage("pages", start)
+        removed = manifest.prune()
+        if search is not None:
+            start = time.perf_counter()
+            search.retain(manifest.pages)
+            stats["search_files"] = write_search_index(search, destination_directory)
+            stats["search_pages"] = len(search.pages)
+            if profile:
+                profile.time_stage("search", start)
+        if site is not None:
+            start = time.perf_counter()
+            site.retain(manifest.pages)
+            stats["site_files"] = write_site_outputs(
+                site,
+                template_path,
+                destination_directory,
+                basepath,
+                compressor,
+                stats.get("rebuilt", []),
+            )
+            if profile:
+                profile.time_stage("site", start)
+        if compressor:
+            files, sidecars = compressor.wait()
+            stats["compressed_files"] = stats.get("compressed_files", 0) + files
+            stats["compressed_sidecars"] = (
+                stats.get("compressed_sidecars", 0) + sidecars
+            )
+        print_build_summary(stats)
+
+        if not shard:
+            graph.set_basepath(basepath)
+            broken = update_dependency_graph(
+                graph,
+                manifest,
+                stats.get("rebuilt", []),
+                removed,
+                content_directory,
+                source_directory,
+                template_path,
+            )
+            graph.save()
+            if broken:
+                count = sum(map(len, broken.values()))
+                print(
+                    f"{count} broken reference(s); run with --check-links for details"
+                )
+    finally:
+        manifest.save()
+        if cache:
+            cache.trim()
+
+    if profile:
+        profile.write_report(args.profile)
+        profile.print_summary()
+        print(f"Wrote build profile to {args.profile}")
+
+    if args.watch:
+        try:
+            watch(
+                source_directory,
+                content_directory,
+                template_path,
+                destination_directory,
+                basepath,
+                manifest,
+                compressor,
+                search,
+                site,
+                args.drafts,
+            )
+        except KeyboardInterrupt:
+            print("Stopped watching")
 
 
 if __name__ == "__main__":
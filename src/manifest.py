@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+
+try:
+    from .compress import remove_sidecars
+    from .frontmatter import read_front_matter
+except ImportError:
+    from compress import remove_sidecars
+    from frontmatter import read_front_matter
+
+MANIFEST_VERSION = 1
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path=None):
+        self.path = path
+        self.template = None
+        self.basepath = None
+        self.compression = []
+        self.shard = None
+        self.pages = {}
+        self.static = set()
+        self.front_matter = {}
+        self.seen = set()
+        self.scanned = set()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError:
+                    data = {}
+            if data.get("version") == MANIFEST_VERSION:
+                self.template = data.get("template")
+                self.basepath = data.get("basepath")
+                self.compression = data.get("compression", [])
+                self.shard = data.get("shard")
+                self.pages = data.get("pages", {})
+                self.static = set(data.get("static", []))
+                self.front_matter = data.get("front_matter", {})
+
+    def configure(self, template_hash, basepath, compression=()):
+        compression = sorted(compression)
+        if (
+            template_hash != self.template
+            or basepath != self.basepath
+            or compression != self.compression
+        ):
+            if self.pages:
+                print("Template, basepath or compression changed, rebuilding all pages")
+            self.pages = {}
+        self.template = template_hash
+        self.basepath = basepath
+        self.compression = compression
+
+    def is_current(self, source_path, dest_path, stat=None):
+        self.seen.add(dest_path)
+        entry = self.pages.get(dest_path)
+        if not entry or entry["source"] != source_path:
+            return False
+        if not os.path.exists(dest_path):
+            return False
+        if stat is None:
+            stat = os.stat(source_path)
+        if entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        if hash_file(source_path) == entry["hash"]:
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return True
+        return False
+
+    def record(
+        self, source_path, dest_path, source_hash, stat=None, template_hash=None
+    ):
+        if stat is None:
+            stat = os.stat(source_path)
+        self.seen.add(dest_path)
+        self.pages[dest_path] = {
+            "source": source_path,
+            "hash": source_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if template_hash:
+            self.pages[dest_path]["template"] = template_hash
+
+    def page_metadata(self, source_path, stat=None):
+        if stat is None:
+            stat = os.stat(source_path)
+        self.scanned.add(source_path)
+        entry = self.front_matter.get(source_path)
+        if (
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return entry["meta"]
+        meta = read_front_matter(source_path)
+        self.front_matter[source_path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "meta": meta,
+        }
+        return meta
+
+    def outputs_of(self, source_path):
+        return [
+            dest_path
+            for dest_path, entry in self.pages.items()
+            if entry["source"] == source_path
+        ]
+
+    def forget(self, dest_path):
+        self.pages.pop(dest_path, None)
+        self.seen.discard(dest_path)
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            print(f"Removed stale page: {dest_path}")
+        remove_sidecars(dest_path)
+
+    def prune(self):
+        removed = sorted(set(self.pages) - self.seen)
+        for dest_path in removed:
+            self.forget(dest_path)
+        for source_path in set(self.front_matter) - self.scanned:
+            del self.front_matter[source_path]
+        return removed
+
+    def save(self, path=None):
+        path = path or self.path
+        data = {
+            "version": MANIFEST_VERSION,
+            "template": self.template,
+            "basepath": self.basepath,
+            "compression": self.compression,
+            "shard": self.shard,
+            "pages": self.pages,
+            "static": sorted(self.static),
+            "front_matter": self.front_matter,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
@@ -1,6 +1,6 @@
 from enum import Enum
 import re
-from typing import Counter
+from functools import lru_cache
 
 try:
     from .textnode import TextNode, TextType, text_node_to_html_node
@@ -48,8 +48,12 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = IMAGE_PATTERN.findall(text)
     return matches
 
 
@@ -84,7 +88,7 @@ def split_nodes_image(old_nodes):
 
 
 def extract_markdown_links(text):
-    matches = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = LINK_PATTERN.findall(text)
     return matches
 
 
@@ -118,74 +122,243 @@ def split_nodes_link(old_nodes):
     return new_nodes
 
 
-def text_to_textnodes(text):
-    old_nodes = [TextNode(text, TextType.TEXT)]
-    delimiters = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+INLINE_TOKEN_PATTERN = re.compile(
+    r"(?P<delimiter>\*\*|[_`])"
+    r"|!\[(?P<alt>[^\[\]]*)\]\((?P<src>[^\(\)]*)\)"
+    r"|(?<!!)\[(?P<anchor>[^\[\]]*)\]\((?P<href>[^\(\)]*)\)"
+)
+INLINE_DELIMITERS = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+NESTED_INLINE_TAGS = {TextType.BOLD: "b", TextType.ITALIC: "i", TextType.LINK: "a"}
+
+
+def _find_closer(text, delimiter, position):
+    if delimiter == "`":
+        return text.find(delimiter, position)
+    # links, images and code spans are opaque, so a delimiter inside them
+    # never closes the emphasis
+    while True:
+        token = INLINE_TOKEN_PATTERN.search(text, position)
+        if not token:
+            return -1
+        found = token.group("delimiter")
+        if found == delimiter:
+            return token.start()
+        position = token.end()
+        if found == "`":
+            close = text.find("`", position)
+            if close != -1:
+                position = close + 1
+
+
+def text_to_textnodes(text, strict=True):
+    nodes = []
+    start = 0
+    position = 0
+
+    while True:
+        token = INLINE_TOKEN_PATTERN.search(text, position)
+        if not token:
+            break
+        index = token.start()
+        delimiter, alt, src, anchor, href = token.groups()
+
+        if delimiter:
+            close = _find_closer(text, delimiter, token.end())
+            if close == -1:
+                if strict:
+                    raise Exception("umatched delimiter")
+                position = token.end()
+                continue
+            if start < index:
+                nodes.append(TextNode(text[start:index], TextType.TEXT))
+            if close > token.end():
+                nodes.append(
+                    TextNode(text[token.end() : close], INLINE_DELIMITERS[delimiter])
+                )
+            start = position = close + len(delimiter)
+            continue
 
-    for delimiter, text_type in delimiters.items():
-        old_nodes = split_nodes_delimiter(old_nodes, delimiter, text_type)
-    old_nodes = split_nodes_image(old_nodes)
-    old_nodes = split_nodes_link(old_nodes)
-    new_nodes = old_nodes
+        if start < index:
+            nodes.append(TextNode(text[start:index], TextType.TEXT))
+        if href is None:
+            nodes.append(TextNode(alt, TextType.IMAGE, src))
+        else:
+            nodes.append(TextNode(anchor, TextType.LINK, href))
+        start = position = token.end()
 
-    return new_nodes
+    if start < len(text) or not text:
+        nodes.append(TextNode(text[start:], TextType.TEXT))
+    return nodes
 
 
-def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
+def _inline_node_to_html(node):
+    tag = NESTED_INLINE_TAGS.get(node.text_type)
+    if not tag or not INLINE_TOKEN_PATTERN.search(node.text):
+        return text_node_to_html_node(node)
+    children = [
+        _inline_node_to_html(child)
+        for child in text_to_textnodes(node.text, strict=False)
+    ]
+    props = {"href": node.url} if node.text_type == TextType.LINK else None
+    return ParentNode(tag, children, props)
 
-    blocks = [block.strip() for block in blocks if block.strip()]
 
-    return blocks
+def text_to_children(text):
+    return [_inline_node_to_html(node) for node in text_to_textnodes(text)]
 
 
-def block_to_blocktype(block):
-    lines = block.split("\n")
+INLINE_MEMO_SIZE = 8192
+INLINE_MEMO_MAX_TEXT = 256
 
-    if re.match(r"^#{1,6} ", block):
-        return BlockType.HEADING
 
-    if block.startswith("```") and block.endswith("```"):
-        return BlockType.CODE
+def _render_inline(text):
+    return "".join(node.to_html() for node in text_to_children(text))
 
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
 
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
+_inline_memo = lru_cache(maxsize=INLINE_MEMO_SIZE)(_render_inline)
 
-    is_ordered_list = True
-    for i, line in enumerate(lines):
-        expected_prefix = f"{i + 1}. "
-        if not line.startswith(expected_prefix):
-            is_ordered_list = False
-            break
 
-    if is_ordered_list and len(lines) > 0:
-        return BlockType.ORDERED_LIST
+def configure_inline_memo(size=INLINE_MEMO_SIZE):
+    global _inline_memo
+    _inline_memo = lru_cache(maxsize=size)(_render_inline) if size else None
 
-    return BlockType.PARAGRAPH
 
+def inline_memo_stats():
+    if _inline_memo is None:
+        return 0, 0
+    info = _inline_memo.cache_info()
+    return info.hits, info.misses
 
-def block_to_children(block):
-    blocktype = block_to_blocktype(block)
+
+def inline_children(text):
+    if _inline_memo is None or len(text) > INLINE_MEMO_MAX_TEXT:
+        return text_to_children(text)
+    return [LeafNode(None, _inline_memo(text))]
+
+
+def iter_blocks(lines):
+    block = []
+    in_fence = False
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if in_fence:
+            block.append(line)
+            if line.rstrip().endswith("```"):
+                in_fence = False
+            continue
+
+        if not line:
+            if block:
+                text = "\n".join(block).strip()
+                if text:
+                    yield text
+                block = []
+            continue
+
+        if not block and line.lstrip().startswith("```"):
+            opening = line.strip()
+            in_fence = len(opening) < 6 or not opening.endswith("```")
+        block.append(line)
+
+    if block:
+        text = "\n".join(block).strip()
+        if text:
+            yield text
+
+
+def markdown_to_blocks(markdown):
+    return list(iter_blocks(markdown.split("\n")))
+
+
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+ORDERED_PREFIXES = tuple(f"{i}. " for i in range(1, 1001))
+
+
+def _classify_heading(block, lines):
+    match = HEADING_PATTERN.match(block)
+    if not match:
+        return BlockType.PARAGRAPH, 0
+    return BlockType.HEADING, match.end() - 1
+
+
+def _classify_code(block, lines):
+    if block.startswith("```") and block.endswith("```"):
+        return BlockType.CODE, 0
+    return BlockType.PARAGRAPH, 0
+
+
+def _classify_quote(block, lines):
+    for line in lines:
+        if not line.startswith(">"):
+            return BlockType.PARAGRAPH, 0
+    return BlockType.QUOTE, 0
+
+
+def _classify_unordered_list(block, lines):
+    for line in lines:
+        if not line.startswith("- "):
+            return BlockType.PARAGRAPH, 0
+    return BlockType.UNORDERED_LIST, 0
+
+
+def _classify_ordered_list(block, lines):
+    if len(lines) > len(ORDERED_PREFIXES):
+        prefixes = [f"{i + 1}. " for i in range(len(lines))]
+    else:
+        prefixes = ORDERED_PREFIXES
+    for line, prefix in zip(lines, prefixes):
+        if not line.startswith(prefix):
+            return BlockType.PARAGRAPH, 0
+    return BlockType.ORDERED_LIST, 0
+
+
+BLOCK_CLASSIFIERS = {
+    "#": _classify_heading,
+    "`": _classify_code,
+    ">": _classify_quote,
+    "-": _classify_unordered_list,
+    "1": _classify_ordered_list,
+}
+
+BLOCK_ITEMS = {
+    BlockType.QUOTE: lambda lines: [line[1:].strip() for line in lines],
+    BlockType.UNORDERED_LIST: lambda lines: [line[2:] for line in lines],
+    BlockType.ORDERED_LIST: lambda lines: [
+        line[line.index(" ") + 1 :] for line in lines
+    ],
+}
+
+
+def classify_block(block):
+    classifier = BLOCK_CLASSIFIERS.get(block[:1])
+    if not classifier:
+        return BlockType.PARAGRAPH, 0, None
+    lines = block.split("\n")
+    blocktype, level = classifier(block, lines)
+    items = BLOCK_ITEMS.get(blocktype)
+    return blocktype, level, items(lines) if items else None
+
+
+def block_to_blocktype(block):
+    classifier = BLOCK_CLASSIFIERS.get(block[:1])
+    if not classifier:
+        return BlockType.PARAGRAPH
+    return classifier(block, block.split("\n"))[0]
+
+
+def block_to_children(block, classification=None):
+    blocktype, level, items = classification or classify_block(block)
 
     match blocktype:
         case BlockType.PARAGRAPH:
             text = block.replace("\n", " ")
-            text_nodes = text_to_textnodes(text)
-            parent_node = ParentNode(
-                "p", [text_node_to_html_node(node) for node in text_nodes]
-            )
+            parent_node = ParentNode("p", inline_children(text))
             return parent_node
 
         case BlockType.HEADING:
-            level = len(re.match(r"^(#+) ", block).group(1))
             text = block[level + 1 :]
-            text_nodes = text_to_textnodes(text)
-            parent_node = ParentNode(
-                f"h{level}", [text_node_to_html_node(node) for node in text_nodes]
-            )
+            parent_node = ParentNode(f"h{level}", inline_children(text))
             return parent_node
 
         case BlockType.CODE:
@@ -198,44 +371,23 @@ def block_to_children(block):
             return parent_node
 
         case BlockType.QUOTE:
-            lines = block.split("\n")
-            child_nodes = []
-            full_text = ""
-            for line in lines:
-                text = line[1:].strip()
-                full_text += text + "\n"
-            full_text = full_text.strip()
-            text_nodes = text_to_textnodes(full_text)
-            parent_node = ParentNode(
-                "blockquote", [text_node_to_html_node(node) for node in text_nodes]
-            )
+            full_text = "\n".join(items).strip()
+            parent_node = ParentNode("blockquote", inline_children(full_text))
             return parent_node
 
         case BlockType.UNORDERED_LIST:
-            lines = block.split("\n")
-            child_nodes = []
-            for line in lines:
-                text = line[2:].strip()
-                text_nodes = text_to_textnodes(text)
-                list_item_node = ParentNode(
-                    "li", [text_node_to_html_node(node) for node in text_nodes]
-                )
-                child_nodes.append(list_item_node)
+            child_nodes = [
+                ParentNode("li", inline_children(text.strip())) for text in items
+            ]
             parent_node = ParentNode("ul", child_nodes)
             return parent_node
 
         case BlockType.ORDERED_LIST:
-            lines = block.split("\n")
             child_nodes = []
-            for line in lines:
-                match = re.match(r"^\d+\. (.+)", line)
-                if not match:
+            for text in items:
+                if not text:
                     raise ValueError("invalid ordered list item")
-                text = match.group(1).strip()
-                text_nodes = text_to_textnodes(text)
-                list_item_node = ParentNode(
-                    "li", [text_node_to_html_node(node) for node in text_nodes]
-                )
+                list_item_node = ParentNode("li", inline_children(text.strip()))
                 child_nodes.append(list_item_node)
             parent_node = ParentNode("ol", child_nodes)
             return parent_node
@@ -244,6 +396,14 @@ def block_to_children(block):
             raise ValueError("unknown block type")
 
 
+def iter_block_nodes(lines, wrap_blocks=None):
+    blocks = iter_blocks(lines)
+    if wrap_blocks:
+        blocks = wrap_blocks(blocks)
+    for block in blocks:
+        yield block_to_children(block)
+
+
 def markdown_to_html_node(markdown):
     html = []
     blocks = markdown_to_blocks(markdown)
@@ -0,0 +1,53 @@
+import asyncio
+
+PIPELINE_DEPTH = 16
+
+
+def run_pipeline(jobs, stages, done, depth=PIPELINE_DEPTH):
+    asyncio.run(_run_pipeline(jobs, stages, done, depth))
+
+
+async def _run_pipeline(jobs, stages, done, depth):
+    loop = asyncio.get_running_loop()
+    queues = [asyncio.Queue(depth) for _ in range(len(stages) + 1)]
+    workers = [count for _, _, count in stages] + [1]
+
+    async def feed():
+        for job in jobs:
+            await queues[0].put((job, None))
+        for _ in range(workers[0]):
+            await queues[0].put(None)
+
+    async def work(func, executor, inbox, outbox):
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            job, value = item
+            try:
+                value = await loop.run_in_executor(executor, func, job, value)
+            except Exception as e:
+                done(job, None, e)
+                continue
+            await outbox.put((job, value))
+
+    async def close(tasks, outbox, count):
+        await asyncio.gather(*tasks)
+        for _ in range(count):
+            await outbox.put(None)
+
+    tasks = [asyncio.create_task(feed())]
+    for i, (func, executor, count) in enumerate(stages):
+        group = [
+            asyncio.create_task(work(func, executor, queues[i], queues[i + 1]))
+            for _ in range(count)
+        ]
+        tasks.append(asyncio.create_task(close(group, queues[i + 1], workers[i + 1])))
+
+    while True:
+        item = await queues[-1].get()
+        if item is None:
+            break
+        job, value = item
+        done(job, value, None)
+    await asyncio.gather(*tasks)
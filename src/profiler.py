@@ -0,0 +1,91 @@
+import json
+import time
+
+
+class PageProfile:
+    def __init__(self):
+        self.stages = {}
+        self.counts = {}
+        self.last = time.perf_counter()
+
+    def mark(self, stage, count=None):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self.last
+        if count is not None:
+            self.counts[stage] = self.counts.get(stage, 0) + count
+        self.last = now
+
+    def to_dict(self):
+        return {"stages": self.stages, "counts": self.counts}
+
+
+class NullPageProfile:
+    def mark(self, stage, count=None):
+        pass
+
+    def to_dict(self):
+        return None
+
+
+NULL_PAGE_PROFILE = NullPageProfile()
+
+
+class BuildProfile:
+    def __init__(self):
+        self.pages = {}
+        self.build_stages = {}
+        self.start = time.perf_counter()
+
+    def add_page(self, page, data):
+        if data:
+            self.pages[page] = data
+
+    def time_stage(self, stage, start):
+        self.build_stages[stage] = self.build_stages.get(stage, 0.0) + (
+            time.perf_counter() - start
+        )
+
+    def stage_totals(self):
+        totals = {}
+        for data in self.pages.values():
+            for stage, seconds in data["stages"].items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+    def report(self):
+        return {
+            "wall_time": time.perf_counter() - self.start,
+            "build_stages": self.build_stages,
+            "stage_totals": self.stage_totals(),
+            "pages": self.pages,
+        }
+
+    def write_report(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=1, sort_keys=True)
+
+    def print_summary(self, top=10):
+        report = self.report()
+        print(f"Build profile: {len(self.pages)} pages in {report['wall_time']:.3f} s")
+        for stage, seconds in sorted(
+            report["build_stages"].items(), key=lambda item: -item[1]
+        ):
+            print(f"  {stage:<20} {seconds * 1000:10.1f} ms")
+
+        totals = report["stage_totals"]
+        if totals:
+            print("Slowest stages (summed over pages):")
+            for stage, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+                print(f"  {stage:<20} {seconds * 1000:10.1f} ms")
+
+        slowest = sorted(
+            self.pages.items(), key=lambda item: -sum(item[1]["stages"].values())
+        )[:top]
+        if slowest:
+            print(f"Slowest {len(slowest)} pages:")
+            for page, data in slowest:
+                stage, seconds = max(data["stages"].items(), key=lambda item: item[1])
+                total = sum(data["stages"].values())
+                print(
+                    f"  {total * 1000:10.1f} ms  {page}  (slowest stage: {stage} {seconds * 1000:.1f} ms)"
+                )
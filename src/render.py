@@ -0,0 +1,100 @@
+import argparse
+import os
+import sys
+
+try:
+    from .frontmatter import split_front_matter
+    from .htmlnode import ParentNode
+    from .markdown_to_html import iter_block_nodes
+    from .sourcefile import iter_lines, map_source
+    from .template import load_template
+except ImportError:
+    from frontmatter import split_front_matter
+    from htmlnode import ParentNode
+    from markdown_to_html import iter_block_nodes
+    from sourcefile import iter_lines, map_source
+    from template import load_template
+
+
+def extract_title(markdown):
+    for line in markdown.splitlines():
+        if line.startswith("# "):
+            return line[2:].strip()
+    raise Exception("No title found in markdown")
+
+
+def extract_title_from_buffer(buffer, start=0):
+    if buffer[start : start + 2] != b"# ":
+        start = buffer.find(b"\n# ", start)
+        if start < 0:
+            raise Exception("No title found in markdown")
+        start += 1
+    end = buffer.find(b"\n", start)
+    if end < 0:
+        end = len(buffer)
+    return buffer[start + 2 : end].decode("utf-8").strip()
+
+
+def read_page(buffer, wrap_blocks=None):
+    meta, offset = split_front_matter(buffer)
+    title = meta.get("title") or extract_title_from_buffer(buffer, offset)
+    lines = iter_lines(buffer, start=offset)
+    return meta, title, iter_block_nodes(lines, wrap_blocks)
+
+
+def render_file(from_path, fp, template=None):
+    with map_source(from_path) as md:
+        _, title, nodes = read_page(md)
+        contents = ParentNode("div", nodes)
+        if template:
+            template.write(fp, {"Title": title, "Content": contents})
+        else:
+            contents.write_html(fp)
+    return title
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src render",
+        description="Render one markdown file without building the site",
+    )
+    parser.add_argument("path", help="markdown file to render")
+    parser.add_argument(
+        "-t",
+        "--template",
+        default="template.html",
+        help="page template (default: template.html, skipped if missing)",
+    )
+    parser.add_argument(
+        "--body",
+        action="store_true",
+        help="write only the rendered content, without the template",
+    )
+    parser.add_argument("--basepath", default="/")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="write the page here instead of standard output",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    template = None
+    if not args.body and os.path.exists(args.template):
+        template = load_template(args.template, args.basepath)
+
+    if args.output == "-":
+        render_file(args.path, sys.stdout, template)
+        return
+    tmp_path = f"{args.output}.tmp"
+    try:
+        with open(tmp_path, "w") as page:
+            render_file(args.path, page, template)
+        os.replace(tmp_path, args.output)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
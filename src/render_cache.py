@@ -0,0 +1,100 @@
+import hashlib
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+
+RENDERER_MODULES = (
+    "frontmatter.py",
+    "htmlnode.py",
+    "markdown_to_html.py",
+    "render.py",
+    "sourcefile.py",
+    "textnode.py",
+)
+DEFAULT_CACHE_SIZE = 256 << 20
+
+
+@lru_cache(maxsize=None)
+def generator_version():
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in RENDERER_MODULES:
+        with open(os.path.join(directory, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"RenderCache({self.directory}, {self.max_bytes})"
+
+    def entry_path(self, source_hash):
+        key = hashlib.sha256(
+            f"{generator_version()}:{source_hash}".encode()
+        ).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.html")
+
+    def get(self, source_hash):
+        path = self.entry_path(source_hash)
+        try:
+            with open(path, encoding="utf-8") as f:
+                title, _, body = f.read().partition("\n")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return title, body
+
+    @contextmanager
+    def open_entry(self, source_hash, title):
+        path = self.entry_path(source_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(title + "\n")
+                yield f
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def trim(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+
+class CachedContent:
+    def __init__(self, node, cache_fp):
+        self.node = node
+        self.cache_fp = cache_fp
+
+    def write_html(self, fp):
+        for chunk in self.node.iter_html():
+            fp.write(chunk)
+            self.cache_fp.write(chunk)
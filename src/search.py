@@ -0,0 +1,261 @@
+import heapq
+import json
+import os
+import re
+import zlib
+
+try:
+    from .htmlnode import ParentNode
+except ImportError:
+    from htmlnode import ParentNode
+
+SEARCH_VERSION = 1
+SEARCH_DIR = "search"
+SEARCH_BUCKETS = 64
+TITLE_WEIGHT = 8
+HEADING_WEIGHT = 3
+TEXT_WEIGHT = 1
+MAX_TOKEN_LENGTH = 32
+SUMMARY_LENGTH = 200
+HEADING_TAGS = frozenset(f"h{level}" for level in range(1, 7))
+TOKEN_PATTERN = re.compile(r"\w+")
+TAG_PATTERN = re.compile(r"<[^>]*>")
+HEADING_PATTERN = re.compile(r"<(h[1-6])>(.*?)</\1>", re.DOTALL)
+PARAGRAPH_PATTERN = re.compile(r"<p>(.*?)</p>", re.DOTALL)
+
+
+def tokenize(text):
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if 1 < len(token) <= MAX_TOKEN_LENGTH
+    ]
+
+
+def term_bucket(term):
+    return zlib.crc32(term.encode("utf-8")) % SEARCH_BUCKETS
+
+
+def node_text(node, separator=" "):
+    parts = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ParentNode):
+            stack.extend(reversed(node.children))
+        elif node.tag is None:
+            parts.append(TAG_PATTERN.sub(separator, node.value))
+        elif node.tag != "img":
+            parts.append(node.value)
+    return separator.join(parts)
+
+
+def summarize(text, length=SUMMARY_LENGTH):
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text.rfind(" ", 0, length)
+    return text[: cut if cut > 0 else length] + "…"
+
+
+class PageText:
+    def __init__(self, terms=True):
+        self.terms = terms
+        self.title = None
+        self.summary = None
+        self.weights = {}
+
+    def add_text(self, text, weight=TEXT_WEIGHT):
+        if not self.terms:
+            return
+        weights = self.weights
+        for token in tokenize(text):
+            weights[token] = weights.get(token, 0) + weight
+
+    def add_title(self, title):
+        self.title = title
+        self.add_text(title, TITLE_WEIGHT)
+
+    def add_node(self, node):
+        if node.tag == "p" and self.summary is None:
+            self.summary = summarize(node_text(node, ""))
+        if not self.terms:
+            return
+        weight = HEADING_WEIGHT if node.tag in HEADING_TAGS else TEXT_WEIGHT
+        self.add_text(node_text(node), weight)
+
+    def watch(self, nodes):
+        nodes = iter(nodes)
+        for node in nodes:
+            self.add_node(node)
+            yield node
+            if not self.terms and self.summary is not None:
+                yield from nodes
+                return
+
+    def add_html(self, html):
+        if self.summary is None:
+            match = PARAGRAPH_PATTERN.search(html)
+            if match:
+                self.summary = summarize(TAG_PATTERN.sub("", match.group(1)))
+        if not self.terms:
+            return
+        position = 0
+        for match in HEADING_PATTERN.finditer(html):
+            self.add_text(TAG_PATTERN.sub(" ", html[position : match.start()]))
+            self.add_text(TAG_PATTERN.sub(" ", match.group(2)), HEADING_WEIGHT)
+            position = match.end()
+        self.add_text(TAG_PATTERN.sub(" ", html[position:]))
+
+
+def encode_postings(postings):
+    encoded = []
+    previous = 0
+    for doc_id, weight in sorted(postings.items()):
+        encoded.append(doc_id - previous)
+        encoded.append(weight)
+        previous = doc_id
+    return encoded
+
+
+def decode_postings(encoded):
+    postings = {}
+    doc_id = 0
+    for i in range(0, len(encoded), 2):
+        doc_id += encoded[i]
+        postings[doc_id] = encoded[i + 1]
+    return postings
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+class SearchIndex:
+    def __init__(self, path=None):
+        self.path = path
+        self.pages = {}
+        self.postings = {}
+        self.buckets = [set() for _ in range(SEARCH_BUCKETS)]
+        self.free_ids = []
+        self.next_id = 0
+        self.dirty_buckets = set()
+        self.docs_changed = False
+
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError:
+                    data = {}
+            if data.get("version") == SEARCH_VERSION:
+                self.pages = data.get("pages", {})
+        for entry in self.pages.values():
+            self._add_postings(entry["id"], entry["terms"])
+        used = {entry["id"] for entry in self.pages.values()}
+        self.next_id = max(used, default=-1) + 1
+        self.free_ids = sorted(set(range(self.next_id)) - used)
+
+    def _add_postings(self, doc_id, terms):
+        for term, weight in terms.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self.buckets[term_bucket(term)].add(term)
+            postings[doc_id] = weight
+
+    def _remove_postings(self, doc_id, terms):
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+                    self.buckets[term_bucket(term)].discard(term)
+
+    def is_current(self, dest_path, source_hash):
+        entry = self.pages.get(dest_path)
+        return bool(entry) and entry["hash"] == source_hash
+
+    def update(self, dest_path, url, title, source_hash, terms):
+        entry = self.pages.get(dest_path)
+        if entry:
+            if (
+                entry["hash"] == source_hash
+                and entry["url"] == url
+                and entry["title"] == title
+                and entry["terms"] == terms
+            ):
+                return
+            doc_id = entry["id"]
+            self._remove_postings(doc_id, entry["terms"])
+            changed = set(entry["terms"]) | set(terms)
+        else:
+            doc_id = heapq.heappop(self.free_ids) if self.free_ids else self._new_id()
+            changed = terms
+        if not entry or entry["url"] != url or entry["title"] != title:
+            self.docs_changed = True
+        self.dirty_buckets.update(term_bucket(term) for term in changed)
+        self.pages[dest_path] = {
+            "id": doc_id,
+            "url": url,
+            "title": title,
+            "hash": source_hash,
+            "terms": terms,
+        }
+        self._add_postings(doc_id, terms)
+
+    def _new_id(self):
+        self.next_id += 1
+        return self.next_id - 1
+
+    def remove(self, dest_path):
+        entry = self.pages.pop(dest_path, None)
+        if not entry:
+            return
+        self._remove_postings(entry["id"], entry["terms"])
+        heapq.heappush(self.free_ids, entry["id"])
+        self.dirty_buckets.update(term_bucket(term) for term in entry["terms"])
+        self.docs_changed = True
+
+    def retain(self, dest_paths):
+        for dest_path in set(self.pages) - set(dest_paths):
+            self.remove(dest_path)
+
+    def write(self, out_dir):
+        os.makedirs(out_dir, exist_ok=True)
+        docs_path = os.path.join(out_dir, "docs.json")
+        rebuild = not os.path.exists(docs_path)
+        buckets = range(SEARCH_BUCKETS) if rebuild else sorted(self.dirty_buckets)
+        written = 0
+        if rebuild or self.docs_changed:
+            docs = [None] * self.next_id
+            for entry in self.pages.values():
+                docs[entry["id"]] = [entry["url"], entry["title"]]
+            _write_json(
+                docs_path,
+                {"version": SEARCH_VERSION, "buckets": SEARCH_BUCKETS, "docs": docs},
+            )
+            written += 1
+
+        for bucket in buckets:
+            bucket_terms = {
+                term: encode_postings(self.postings[term])
+                for term in self.buckets[bucket]
+            }
+            _write_json(os.path.join(out_dir, f"terms-{bucket:02x}.json"), bucket_terms)
+            written += 1
+        self.dirty_buckets.clear()
+        self.docs_changed = False
+        return written
+
+    def save(self, path=None):
+        path = path or self.path
+        data = {"version": SEARCH_VERSION, "pages": self.pages}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, path)
@@ -0,0 +1,252 @@
+import argparse
+import os
+import socketserver
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from .frontmatter import split_front_matter
+    from .main import render_source
+    from .markdown_to_html import markdown_to_html_node
+    from .render import extract_title
+    from .render_cache import DEFAULT_CACHE_SIZE, RenderCache
+    from .template import load_template
+except ImportError:
+    from frontmatter import split_front_matter
+    from main import render_source
+    from markdown_to_html import markdown_to_html_node
+    from render import extract_title
+    from render_cache import DEFAULT_CACHE_SIZE, RenderCache
+    from template import load_template
+
+DEFAULT_PORT = 8765
+MAX_REQUEST_SIZE = 16 << 20
+
+
+def render_markdown(markdown, template=None):
+    source = markdown.encode("utf-8")
+    meta, offset = split_front_matter(source)
+    markdown = source[offset:].decode("utf-8")
+    contents = markdown_to_html_node(markdown).to_html()
+    if template is None:
+        return contents
+    title = meta.get("title") or extract_title(markdown)
+    return template.render({"Title": title, "Content": contents})
+
+
+def render_content_file(path, template, cache=None):
+    with open(path, "rb") as md:
+        source = md.read()
+    if not source:
+        raise ValueError("file empty")
+    return render_source(source, template, cache)[1]
+
+
+class RenderService:
+    def __init__(self, template_path, basepath="/", content_dir="content", cache=None):
+        self.template_path = template_path
+        self.basepath = basepath
+        self.content_dir = os.path.realpath(content_dir)
+        self.cache = cache
+        self.pool = None
+        self._template = None
+        self._template_mtime = None
+        self._lock = threading.Lock()
+
+    def start_workers(self, jobs):
+        if jobs > 1:
+            self.pool = ProcessPoolExecutor(jobs)
+            self.pool.submit(int).result()
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown()
+
+    def template(self):
+        mtime = os.stat(self.template_path).st_mtime_ns
+        with self._lock:
+            if mtime != self._template_mtime:
+                self._template = load_template(self.template_path, self.basepath)
+                self._template_mtime = mtime
+            return self._template
+
+    def _run(self, fn, *args):
+        if self.pool:
+            return self.pool.submit(fn, *args).result()
+        return fn(*args)
+
+    def render_markdown(self, markdown, body_only=False):
+        template = None if body_only else self.template()
+        return self._run(render_markdown, markdown, template)
+
+    def render_path(self, path):
+        full_path = os.path.realpath(os.path.join(self.content_dir, path))
+        if os.path.commonpath([full_path, self.content_dir]) != self.content_dir:
+            raise PermissionError(f"{path} is outside {self.content_dir}")
+        return self._run(render_content_file, full_path, self.template(), self.cache)
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def send_text(self, status, text, content_type="text/plain; charset=utf-8"):
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def render(self, render):
+        try:
+            html = render()
+        except FileNotFoundError as e:
+            self.send_text(404, f"{e}\n")
+        except PermissionError as e:
+            self.send_text(403, f"{e}\n")
+        except Exception as e:
+            self.send_text(422, f"{type(e).__name__}: {e}\n")
+        else:
+            self.send_text(200, html, "text/html; charset=utf-8")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/health":
+            self.send_text(200, "ok\n")
+        elif url.path == "/render" and "path" in query:
+            self.render(lambda: self.server.service.render_path(query["path"][0]))
+        else:
+            self.send_text(404, "not found\n")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/render":
+            self.send_text(404, "not found\n")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_SIZE:
+            self.close_connection = True
+            self.send_text(413, "request too large\n")
+            return
+        markdown = self.rfile.read(length).decode("utf-8", "replace")
+        body_only = parse_qs(url.query).get("body") == ["1"]
+        self.render(lambda: self.server.service.render_markdown(markdown, body_only))
+
+
+class UnixRenderRequestHandler(RenderRequestHandler):
+    disable_nagle_algorithm = False
+
+
+class _PooledServerMixIn:
+    daemon_threads = True
+    quiet = False
+
+    def start_pool(self, threads):
+        self.threads = ThreadPoolExecutor(max_workers=threads)
+
+    def process_request(self, request, client_address):
+        self.threads.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.threads.shutdown(wait=False, cancel_futures=True)
+
+
+class RenderHTTPServer(_PooledServerMixIn, HTTPServer):
+    pass
+
+
+class RenderUnixServer(_PooledServerMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+def make_server(service, port=DEFAULT_PORT, socket_path=None, threads=8):
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = RenderUnixServer(socket_path, UnixRenderRequestHandler)
+    else:
+        server = RenderHTTPServer(("127.0.0.1", port), RenderRequestHandler)
+    server.service = service
+    server.start_pool(threads)
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src serve",
+        description="Keep the renderer warm and render pages on request",
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="listen on a Unix domain socket instead of localhost TCP",
+    )
+    parser.add_argument("--template", default="template.html")
+    parser.add_argument("--basepath", default="/")
+    parser.add_argument("--content", default="content")
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=8,
+        help="handle up to N connections at once (default: 8)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="render in N worker processes (default: in the request thread)",
+    )
+    parser.add_argument("--cache-dir", default=".render-cache")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="render content paths without consulting the cache",
+    )
+    parser.add_argument("--quiet", action="store_true", help="do not log requests")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cache = None if args.no_cache else RenderCache(args.cache_dir, DEFAULT_CACHE_SIZE)
+    service = RenderService(args.template, args.basepath, args.content, cache)
+    service.template()
+    service.start_workers(args.jobs)
+    server = make_server(service, args.port, args.socket, args.threads)
+    server.quiet = args.quiet
+    if args.socket:
+        print(f"Serving on unix:{args.socket}", flush=True)
+    else:
+        host, port = server.server_address[:2]
+        print(f"Serving on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped serving")
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
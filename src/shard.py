@@ -0,0 +1,129 @@
+import argparse
+import glob
+import hashlib
+import os
+import re
+import shutil
+
+try:
+    from .manifest import BuildManifest
+    from .staticcontent import copy_static_to_public
+except ImportError:
+    from manifest import BuildManifest
+    from staticcontent import copy_static_to_public
+
+SHARD_STRATEGIES = ("hash", "size")
+SHARD_MANIFEST_PATTERN = re.compile(r"^\.shard-(\d+)-of-(\d+)\.json$")
+
+
+def parse_shard(value):
+    match = re.fullmatch(r"(\d+)/(\d+)", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {index} is not in 1..{count}")
+    return index, count
+
+
+def shard_manifest_path(dest_dir, index, count):
+    return os.path.join(dest_dir, f".shard-{index}-of-{count}.json")
+
+
+def _path_key(path):
+    return path.replace(os.sep, "/")
+
+
+def _hash_shard(path, count):
+    digest = hashlib.sha256(_path_key(path).encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def select_shard(pages, index, count, strategy="hash"):
+    if strategy == "hash":
+        return [page for page in pages if _hash_shard(page[0], count) == index - 1]
+    if strategy != "size":
+        raise ValueError(f"Unknown shard strategy: {strategy}")
+
+    loads = [0] * count
+    selected = []
+    sized = sorted(
+        ((os.path.getsize(page[0]), _path_key(page[0]), page) for page in pages),
+        key=lambda item: (-item[0], item[1]),
+    )
+    for size, _, page in sized:
+        shard = min(range(count), key=lambda i: (loads[i], i))
+        loads[shard] += size
+        if shard == index - 1:
+            selected.append(page)
+    return selected
+
+
+def _load_shard(shard_dir):
+    names = [
+        name for name in os.listdir(shard_dir) if SHARD_MANIFEST_PATTERN.match(name)
+    ]
+    if len(names) != 1:
+        raise ValueError(
+            f"Expected one shard manifest in {shard_dir}, found {len(names)}"
+        )
+    manifest = BuildManifest(os.path.join(shard_dir, names[0]))
+    if not manifest.shard:
+        raise ValueError(f"Unreadable shard manifest: {manifest.path}")
+    return manifest
+
+
+def merge_shards(shard_dirs, dest_dir, manifest_path):
+    for shard_dir in shard_dirs:
+        if os.path.realpath(shard_dir) == os.path.realpath(dest_dir):
+            raise ValueError(f"Cannot merge shard {shard_dir} into itself")
+    shards = [(shard_dir, _load_shard(shard_dir)) for shard_dir in shard_dirs]
+    first = shards[0][1]
+    count = first.shard["count"]
+    settings = (
+        first.template,
+        first.basepath,
+        first.compression,
+        first.shard["strategy"],
+    )
+    indexes = sorted(manifest.shard["index"] for _, manifest in shards)
+    if indexes != list(range(1, count + 1)):
+        raise ValueError(f"Expected shards 1..{count}, got {indexes}")
+
+    merged = BuildManifest(manifest_path)
+    merged.pages = {}
+    merged.static = set()
+    merged.template, merged.basepath, merged.compression = settings[:3]
+    for shard_dir, manifest in shards:
+        label = f"shard {manifest.shard['index']}/{manifest.shard['count']}"
+        if manifest.shard["count"] != count or (
+            manifest.template,
+            manifest.basepath,
+            manifest.compression,
+            manifest.shard["strategy"],
+        ) != settings:
+            raise ValueError(f"{label} in {shard_dir} was built with other settings")
+
+        shard_dest = manifest.shard["dest"]
+        for dest_path, entry in manifest.pages.items():
+            relative = os.path.relpath(dest_path, shard_dest)
+            if not os.path.isfile(os.path.join(shard_dir, relative)):
+                raise ValueError(f"{label} is missing {relative}")
+            merged_path = os.path.join(dest_dir, relative)
+            if merged_path in merged.pages:
+                raise ValueError(f"{relative} was built by more than one shard")
+            merged.pages[merged_path] = entry
+        for dest_path in manifest.static:
+            merged.static.add(
+                os.path.join(dest_dir, os.path.relpath(dest_path, shard_dest))
+            )
+
+    if os.path.exists(dest_dir):
+        shutil.rmtree(dest_dir)
+    for shard_dir, _ in shards:
+        copy_static_to_public(shard_dir, dest_dir, clean=False)
+    for path in glob.glob(os.path.join(dest_dir, ".shard-*-of-*.json")):
+        os.remove(path)
+    merged.save()
+    print(f"Merged {len(shards)} shard(s): {len(merged.pages)} page(s)")
+    return merged
@@ -0,0 +1,241 @@
+import json
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from html import escape
+
+try:
+    from .frontmatter import parse_date
+except ImportError:
+    from frontmatter import parse_date
+
+SITE_VERSION = 1
+FEED_SIZE = 20
+INDEX_PAGE = "index.html"
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "feed.xml"
+
+
+def _iso_date(mtime):
+    return datetime.fromtimestamp(mtime, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _published(entry):
+    if entry.get("date"):
+        return parse_date(entry["date"])
+    return datetime.fromtimestamp(entry["mtime"], timezone.utc)
+
+
+def _newest_first(entries):
+    return sorted(
+        entries,
+        key=lambda entry: (-_published(entry).timestamp(), entry["url"]),
+    )
+
+
+def _directory_url(entry):
+    url = entry["url"]
+    directory = url[: url.rfind("/")]
+    if url.endswith("/" + INDEX_PAGE):
+        directory = directory[: directory.rfind("/")]
+    return directory + "/"
+
+
+class SiteModel:
+    def __init__(self, path=None):
+        self.path = path
+        self.template = None
+        self.basepath = None
+        self.site_url = None
+        self.pages = {}
+        self.listings = {}
+        self.dirty = set()
+        self.changed = False
+
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError:
+                    data = {}
+            if data.get("version") == SITE_VERSION:
+                self.template = data.get("template")
+                self.basepath = data.get("basepath")
+                self.site_url = data.get("site_url")
+                self.pages = data.get("pages", {})
+                self.listings = data.get("listings", {})
+
+    def configure(self, template_hash, basepath, site_url):
+        if (template_hash, basepath, site_url) != (
+            self.template,
+            self.basepath,
+            self.site_url,
+        ):
+            self.dirty.update(
+                self.listed_in(path, entry) for path, entry in self.pages.items()
+            )
+            self.dirty.discard(None)
+            self.changed = True
+        self.template = template_hash
+        self.basepath = basepath
+        self.site_url = site_url
+
+    def is_home(self, entry):
+        return entry["url"] == (self.basepath or "/") + INDEX_PAGE
+
+    def listed_in(self, dest_path, entry):
+        directory = os.path.dirname(dest_path)
+        if os.path.basename(dest_path) != INDEX_PAGE:
+            return directory
+        if self.is_home(entry):
+            return None
+        return os.path.dirname(directory)
+
+    def _mark_dirty(self, dest_path, entry):
+        directory = self.listed_in(dest_path, entry)
+        if directory is not None:
+            self.dirty.add(directory)
+        self.changed = True
+
+    def is_current(self, dest_path, source_hash):
+        entry = self.pages.get(dest_path)
+        return bool(entry) and entry["hash"] == source_hash
+
+    def update(
+        self, dest_path, source_path, url, title, summary, mtime, source_hash, date=None
+    ):
+        entry = {
+            "source": source_path,
+            "url": url,
+            "title": title,
+            "summary": summary or "",
+            "mtime": mtime,
+            "date": date,
+            "hash": source_hash,
+        }
+        previous = self.pages.get(dest_path)
+        if previous == entry:
+            return
+        if previous:
+            self._mark_dirty(dest_path, previous)
+        self.pages[dest_path] = entry
+        self._mark_dirty(dest_path, entry)
+
+    def remove(self, dest_path):
+        entry = self.pages.pop(dest_path, None)
+        if entry:
+            self._mark_dirty(dest_path, entry)
+
+    def retain(self, dest_paths):
+        for dest_path in set(self.pages) - set(dest_paths):
+            self.remove(dest_path)
+
+    def listing_directories(self):
+        directories = {}
+        for dest_path, entry in self.pages.items():
+            directory = self.listed_in(dest_path, entry)
+            if directory is not None:
+                directories.setdefault(directory, []).append(entry)
+        return {
+            directory: _newest_first(entries)
+            for directory, entries in directories.items()
+        }
+
+    def listing_entries(self, directory):
+        return _newest_first(
+            entry
+            for dest_path, entry in self.pages.items()
+            if self.listed_in(dest_path, entry) == directory
+        )
+
+    def authored_index(self, directory):
+        path = os.path.join(directory, INDEX_PAGE)
+        return path if path in self.pages else None
+
+    def listing(self, directory, entries):
+        name = os.path.basename(directory).replace("-", " ").replace("_", " ")
+        title = name.title() or "Pages"
+        items = self.listing_items(entries)
+        return title, f"<div><h1>{escape(title, False)}</h1>{items}</div>"
+
+    def listing_items(self, entries):
+        html = ['<ul class="listing">']
+        for entry in entries:
+            html.append(
+                f'<li><a href="{escape(entry["url"])}">'
+                f"{escape(entry['title'], False)}</a>"
+            )
+            if entry["summary"]:
+                html.append(f"<p>{escape(entry['summary'], False)}</p>")
+            html.append("</li>")
+        html.append("</ul>")
+        return "".join(html)
+
+    def absolute_url(self, url):
+        return self.site_url.rstrip("/") + url
+
+    def sitemap(self):
+        urls = [(entry["url"], entry["mtime"]) for entry in self.pages.values()]
+        for directory, entries in self.listing_directories().items():
+            if self.authored_index(directory):
+                continue
+            mtime = max(entry["mtime"] for entry in entries)
+            urls.append((_directory_url(entries[0]), mtime))
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for url, mtime in sorted(urls):
+            lines.append(
+                f"<url><loc>{escape(self.absolute_url(url))}</loc>"
+                f"<lastmod>{_iso_date(mtime)}</lastmod></url>"
+            )
+        lines.append("</urlset>")
+        return "\n".join(lines) + "\n"
+
+    def feed(self, count=FEED_SIZE):
+        home = self.basepath or "/"
+        title = self.site_url
+        listings = self.listing_directories()
+        entries = []
+        for dest_path, entry in self.pages.items():
+            if self.is_home(entry):
+                title = entry["title"]
+            elif not (
+                os.path.basename(dest_path) == INDEX_PAGE
+                and os.path.dirname(dest_path) in listings
+            ):
+                entries.append(entry)
+        entries = _newest_first(entries)
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<rss version="2.0"><channel>',
+            f"<title>{escape(title, False)}</title>",
+            f"<link>{escape(self.absolute_url(home))}</link>",
+            f"<description>{escape(title, False)}</description>",
+        ]
+        for entry in entries[:count]:
+            link = escape(self.absolute_url(entry["url"]))
+            lines.append(
+                f"<item><title>{escape(entry['title'], False)}</title>"
+                f"<link>{link}</link><guid>{link}</guid>"
+                f"<pubDate>{format_datetime(_published(entry))}</pubDate>"
+                f"<description>{escape(entry['summary'], False)}</description></item>"
+            )
+        lines.append("</channel></rss>")
+        return "\n".join(lines) + "\n"
+
+    def save(self, path=None):
+        path = path or self.path
+        data = {
+            "version": SITE_VERSION,
+            "template": self.template,
+            "basepath": self.basepath,
+            "site_url": self.site_url,
+            "pages": self.pages,
+            "listings": self.listings,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
@@ -0,0 +1,25 @@
+import mmap
+import os
+from contextlib import contextmanager
+
+LINE_CHUNK_SIZE = 1 << 18
+
+
+@contextmanager
+def map_source(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("file empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def iter_lines(buffer, chunk_size=LINE_CHUNK_SIZE, start=0):
+    size = len(buffer)
+    while True:
+        end = buffer.find(b"\n", min(start + chunk_size, size))
+        if end < 0:
+            yield from buffer[start:].decode("utf-8").split("\n")
+            return
+        yield from buffer[start:end].decode("utf-8").split("\n")
+        start = end + 1
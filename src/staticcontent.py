@@ -1,34 +1,156 @@
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
+try:
+    from .compress import remove_sidecars
+except ImportError:
+    from compress import remove_sidecars
 
-def copy_static_to_public(source_dir, dest_dir):
-    if os.path.exists(dest_dir):
+LARGE_FILE_SIZE = 1 << 20
+COPY_BATCH_SIZE = 64
+
+
+def copy_static_to_public(
+    source_dir,
+    dest_dir,
+    clean=True,
+    previous=(),
+    link=False,
+    workers=None,
+    compressor=None,
+    refresh=False,
+):
+    if clean and os.path.exists(dest_dir):
         print(f"Deleting contents of {dest_dir}...")
         shutil.rmtree(dest_dir)
-    
-    os.makedirs(dest_dir, exist_ok=True)
-    print(f"Created directory: {dest_dir}")
-    
-    _copy_directory_contents(source_dir, dest_dir)
 
+    if not os.path.exists(dest_dir):
+        os.makedirs(dest_dir, exist_ok=True)
+        print(f"Created directory: {dest_dir}")
+
+    counts = {"copied": 0, "unchanged": 0, "removed": 0}
+    synced = set()
+    pending = []
+    unchanged = [] if refresh else None
+    _collect_directory_contents(
+        source_dir, dest_dir, synced, pending, counts, unchanged
+    )
+    for dst_path in unchanged or ():
+        _update_sidecars(dst_path, compressor, refresh)
+
+    if pending:
+        small = [job for job in pending if job[2] < LARGE_FILE_SIZE]
+        batches = [[job] for job in pending if job[2] >= LARGE_FILE_SIZE]
+        batches.extend(
+            small[i : i + COPY_BATCH_SIZE] for i in range(0, len(small), COPY_BATCH_SIZE)
+        )
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for batch in pool.map(lambda batch: _copy_batch(batch, link), batches):
+                for src_path, dst_path, _, _ in batch:
+                    counts["copied"] += 1
+                    print(f"Copied file: {src_path} -> {dst_path}")
+                    _update_sidecars(dst_path, compressor, refresh)
+
+    for dst_path in sorted(set(previous) - synced):
+        if os.path.isfile(dst_path):
+            os.remove(dst_path)
+            print(f"Removed file: {dst_path}")
+            counts["removed"] += 1
+        if compressor or refresh:
+            remove_sidecars(dst_path)
+
+    print(
+        f"Static files: {counts['copied']} copied, {counts['unchanged']} unchanged, "
+        f"{counts['removed']} removed"
+    )
+    return synced
+
+
+def _dest_state(src_stat, dst_path):
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return "missing"
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return "current"
+    if (
+        src_stat.st_size == dst_stat.st_size
+        and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+    ):
+        return "current"
+    return "stale"
+
+
+def _copy_file(src_path, dst_path, link=False, exists=True):
+    tmp_path = f"{dst_path}.tmp" if exists else dst_path
+    if link:
+        try:
+            os.link(src_path, tmp_path)
+            if exists:
+                os.replace(tmp_path, dst_path)
+            return
+        except OSError:
+            if exists and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    # copy2 already uses sendfile on Linux and fcopyfile on macOS
+    shutil.copy2(src_path, tmp_path)
+    if exists:
+        os.replace(tmp_path, dst_path)
 
-def _copy_directory_contents(src, dst):
+
+def _copy_batch(batch, link=False):
+    for src_path, dst_path, _, exists in batch:
+        _copy_file(src_path, dst_path, link, exists)
+    return batch
+
+
+def _update_sidecars(dst_path, compressor, refresh=False):
+    if compressor:
+        compressor.submit(dst_path)
+    elif refresh:
+        remove_sidecars(dst_path)
+
+
+def _collect_directory_contents(src, dst, synced, pending, counts, unchanged=None):
     if not os.path.exists(src):
         print(f"Source directory does not exist: {src}")
         return
-    
-    items = os.listdir(src)
-    
-    for item in items:
-        src_path = os.path.join(src, item)
-        dst_path = os.path.join(dst, item)
-        
-        if os.path.isfile(src_path):
-            shutil.copy2(src_path, dst_path)
-            print(f"Copied file: {src_path} -> {dst_path}")
-        
-        elif os.path.isdir(src_path):
-            os.makedirs(dst_path, exist_ok=True)
-            print(f"Created directory: {dst_path}")
-            _copy_directory_contents(src_path, dst_path)
\ No newline at end of file
+
+    with os.scandir(src) as entries:
+        for entry in entries:
+            dst_path = os.path.join(dst, entry.name)
+
+            if entry.is_file():
+                synced.add(dst_path)
+                stat = entry.stat()
+                state = _dest_state(stat, dst_path)
+                if state == "current":
+                    counts["unchanged"] += 1
+                    if unchanged is not None:
+                        unchanged.append(dst_path)
+                    continue
+                pending.append((entry.path, dst_path, stat.st_size, state == "stale"))
+
+            elif entry.is_dir():
+                if not os.path.isdir(dst_path):
+                    os.makedirs(dst_path, exist_ok=True)
+                    print(f"Created directory: {dst_path}")
+                _collect_directory_contents(
+                    entry.path, dst_path, synced, pending, counts, unchanged
+                )
+
+
+def sync_static_file(source_dir, dest_dir, src_path, link=False, compressor=None):
+    dst_path = os.path.join(dest_dir, os.path.relpath(src_path, source_dir))
+    if os.path.isfile(src_path):
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        _copy_file(src_path, dst_path, link)
+        print(f"Copied file: {src_path} -> {dst_path}")
+        _update_sidecars(dst_path, compressor)
+    elif os.path.isfile(dst_path):
+        os.remove(dst_path)
+        print(f"Removed file: {dst_path}")
+        if compressor:
+            remove_sidecars(dst_path)
+    return dst_path
@@ -0,0 +1,46 @@
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    def __init__(self, text, basepath="/"):
+        if not text:
+            raise ValueError("file empty")
+        text = text.replace('href="/', f'href="{basepath}')
+        text = text.replace('src="/', f'src="{basepath}')
+
+        self.basepath = basepath
+        self.literals = []
+        self.slots = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.literals.append(text[position : match.start()])
+            self.slots.append(match.group(1))
+            position = match.end()
+        self.literals.append(text[position:])
+
+    def __repr__(self):
+        return f"Template({self.slots}, {self.basepath})"
+
+    def render(self, variables):
+        parts = [self.literals[0]]
+        for name, literal in zip(self.slots, self.literals[1:]):
+            parts.append(str(variables.get(name, "")))
+            parts.append(literal)
+        return "".join(parts)
+
+    def write(self, fp, variables):
+        fp.write(self.literals[0])
+        for name, literal in zip(self.slots, self.literals[1:]):
+            value = variables.get(name, "")
+            if hasattr(value, "write_html"):
+                value.write_html(fp)
+            else:
+                fp.write(str(value))
+            fp.write(literal)
+
+
+def load_template(template_path, basepath="/"):
+    with open(template_path) as tmp:
+        return Template(tmp.read(), basepath)
@@ -1,4 +1,6 @@
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
 
 try:
     from .htmlnode import HTMLNode, ParentNode, LeafNode
@@ -16,6 +18,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -34,6 +38,16 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
+@lru_cache(maxsize=4096)
+def _link_props(url):
+    return MappingProxyType({"href": url})
+
+
+@lru_cache(maxsize=4096)
+def _image_props(url, alt):
+    return MappingProxyType({"src": url, "alt": alt})
+
+
 def text_node_to_html_node(text_node):
     match text_node.text_type:
         case TextType.TEXT:
@@ -45,10 +59,10 @@ def text_node_to_html_node(text_node):
         case TextType.CODE:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, props={"href": text_node.url})
+            return LeafNode("a", text_node.text, props=_link_props(text_node.url))
         case TextType.IMAGE:
             return LeafNode(
-                "img", None, props={"src": text_node.url, "alt": text_node.text}
+                "img", None, props=_image_props(text_node.url, text_node.text)
             )
         case _:
             raise ValueError("unknown text type")
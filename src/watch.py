@@ -0,0 +1,251 @@
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from functools import lru_cache
+
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+INOTIFY_EVENT = struct.Struct("iIII")
+INOTIFY_READ_SIZE = 1 << 16
+
+
+def snapshot(paths):
+    entries = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            entries[path] = (stat.st_mtime_ns, stat.st_size)
+        elif os.path.isdir(path):
+            _snapshot_directory(path, entries)
+    return entries
+
+
+def _snapshot_directory(path, entries):
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir():
+                _snapshot_directory(entry.path, entries)
+            elif entry.is_file():
+                stat = entry.stat()
+                entries[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+
+def diff_snapshots(old, new):
+    changed = [path for path, state in new.items() if old.get(path) != state]
+    removed = [path for path in old if path not in new]
+    return changed, removed
+
+
+def _is_under(path, directory):
+    return path == directory or path.startswith(os.path.join(directory, ""))
+
+
+class Watcher:
+    def __init__(self, paths, interval=0.05):
+        self.paths = paths
+        self.interval = interval
+        self.state = snapshot(paths)
+
+    def set_paths(self, paths):
+        added = [path for path in paths if path not in self.paths]
+        dropped = [path for path in self.paths if path not in paths]
+        for path in list(self.state):
+            if any(_is_under(path, old) for old in dropped):
+                del self.state[path]
+        self.state.update(snapshot(added))
+        self.paths = paths
+
+    def poll(self):
+        current = snapshot(self.paths)
+        changes = diff_snapshots(self.state, current)
+        self.state = current
+        return changes
+
+    def wait(self):
+        while True:
+            changed, removed = self.poll()
+            if changed or removed:
+                return changed, removed
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+@lru_cache(maxsize=None)
+def _inotify():
+    # ctypes is only imported for --watch on Linux
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class InotifyWatcher:
+    def __init__(self, paths, interval=0.05):
+        self.libc = _inotify()
+        if self.libc is None:
+            raise OSError("inotify is not available")
+        from ctypes import get_errno
+
+        self.get_errno = get_errno
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(get_errno(), "inotify_init1 failed")
+        self.interval = interval
+        self.paths = []
+        self.roots = set()
+        self.files = set()
+        self.known = set()
+        self.watches = {}
+        try:
+            self.set_paths(paths)
+        except BaseException:
+            os.close(self.fd)
+            raise
+
+    def _add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(directory or "."), INOTIFY_MASK
+        )
+        if wd >= 0:
+            self.watches[wd] = directory
+            return
+        error = self.get_errno()
+        if error not in (errno.ENOENT, errno.ENOTDIR):
+            raise OSError(error, f"cannot watch {directory}: {os.strerror(error)}")
+
+    def _watch_tree(self, directory, changes=None):
+        self._add_watch(directory)
+        try:
+            entries = list(os.scandir(directory))
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                self._watch_tree(entry.path, changes)
+            elif entry.is_file():
+                self.known.add(entry.path)
+                if changes is not None:
+                    changes[entry.path] = True
+
+    def set_paths(self, paths):
+        for path in self.paths:
+            if path in paths:
+                continue
+            self.roots.discard(path)
+            self.files.discard(path)
+            self.known = {known for known in self.known if not _is_under(known, path)}
+            for wd, directory in list(self.watches.items()):
+                if _is_under(directory, path):
+                    self.libc.inotify_rm_watch(self.fd, wd)
+                    del self.watches[wd]
+        for path in paths:
+            if path in self.paths:
+                continue
+            if os.path.isdir(path):
+                self.roots.add(path)
+                self._watch_tree(path)
+            else:
+                # watch the parent so editors that replace the file are seen
+                self.files.add(path)
+                self._add_watch(os.path.dirname(path))
+        self.paths = paths
+
+    def _is_watched(self, path):
+        return path in self.files or any(_is_under(path, root) for root in self.roots)
+
+    def _handle(self, wd, mask, name, changes):
+        if mask & IN_Q_OVERFLOW:
+            for path in self.known | self.files:
+                changes[path] = os.path.exists(path)
+            return
+        if mask & IN_IGNORED:
+            self.watches.pop(wd, None)
+            return
+        directory = self.watches.get(wd)
+        if directory is None or not name:
+            return
+        path = os.path.join(directory, os.fsdecode(name))
+        if not self._is_watched(path):
+            return
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self._watch_tree(path, changes)
+                except OSError as e:
+                    print(f"Not watching {path}: {e}")
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                for known in [known for known in self.known if _is_under(known, path)]:
+                    self.known.discard(known)
+                    changes[known] = False
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self.known.discard(path)
+            changes[path] = False
+        elif mask & (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_TO):
+            self.known.add(path)
+            changes[path] = True
+
+    def poll(self):
+        changes = {}
+        while True:
+            try:
+                data = os.read(self.fd, INOTIFY_READ_SIZE)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                self._handle(wd, mask, name, changes)
+        changed = [path for path, exists in changes.items() if exists]
+        removed = [path for path, exists in changes.items() if not exists]
+        return changed, removed
+
+    def wait(self):
+        while True:
+            select.select([self.fd], [], [])
+            # let a burst of writes from one save settle into a single rebuild
+            time.sleep(self.interval)
+            changed, removed = self.poll()
+            if changed or removed:
+                return changed, removed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(paths, interval=0.05):
+    try:
+        return InotifyWatcher(paths, interval)
+    except OSError:
+        return Watcher(paths, interval)
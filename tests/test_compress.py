@@ -0,0 +1,76 @@
+import gzip
+import os
+import pickle
+import tempfile
+import unittest
+
+from src.compress import Compressor, remove_sidecars, write_sidecars
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.data = b"<p>hello world</p>\n" * 100
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name, data=None):
+        path = os.path.join(self.root, name)
+        with open(path, "wb") as f:
+            f.write(self.data if data is None else data)
+        return path
+
+    def test_writes_gzip_sidecar(self):
+        page = self.path("index.html")
+        self.assertEqual(write_sidecars(page, self.data, ["gzip"]), 1)
+        with gzip.open(page + ".gz") as f:
+            self.assertEqual(f.read(), self.data)
+
+        css = self.path("site.css")
+        self.assertEqual(write_sidecars(css, None, ["gzip"]), 1)
+        self.assertTrue(os.path.exists(css + ".gz"))
+
+    def test_skips_incompressible_and_small_files(self):
+        image = self.path("photo.PNG")
+        self.assertEqual(write_sidecars(image, None, ["gzip"]), 0)
+        self.assertFalse(os.path.exists(image + ".gz"))
+
+        page = self.path("index.html")
+        write_sidecars(page, None, ["gzip"])
+        self.assertEqual(write_sidecars(page, b"tiny", ["gzip"]), 0)
+        self.assertFalse(os.path.exists(page + ".gz"))
+
+        noise = os.urandom(4096)
+        blob = self.path("blob.bin", noise)
+        self.assertEqual(write_sidecars(blob, noise, ["gzip"]), 0)
+        self.assertFalse(os.path.exists(blob + ".gz"))
+
+    def test_remove_sidecars(self):
+        page = self.path("index.html")
+        write_sidecars(page, None, ["gzip"])
+        remove_sidecars(page)
+        remove_sidecars(page)
+        self.assertEqual(os.listdir(self.root), ["index.html"])
+
+    def test_compressor_pool(self):
+        compressor = Compressor(["gzip"], workers=2)
+        pages = [self.path(f"page{i}.html") for i in range(10)]
+        for page in pages:
+            compressor.submit(page, self.data)
+        compressor.submit(self.path("a.png"))
+        self.assertEqual(compressor.wait(), (10, 10))
+        for page in pages:
+            self.assertTrue(os.path.exists(page + ".gz"))
+
+        copy = pickle.loads(pickle.dumps(compressor))
+        self.assertEqual((copy.formats, copy.files), (("gzip",), 0))
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            Compressor(["lzma9000"])
+
+
+if __name__ == "__main__":
+    unittest.main()
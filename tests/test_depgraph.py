@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+from src.depgraph import (
+    BASEPATH_INPUT,
+    DependencyGraph,
+    resolve_reference,
+    scan_references,
+)
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(os.path.join(self.static, "images"))
+        self.index = os.path.join(self.content, "index.md")
+        self.post = os.path.join(self.content, "blog", "post.md")
+        self.image = os.path.join(self.static, "images", "cat.png")
+        for path in (self.index, self.post, self.image, self.template):
+            with open(path, "w") as f:
+                f.write("x")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def resolve(self, url, from_path):
+        return resolve_reference(url, from_path, self.content, self.static)
+
+    def test_scan_references_skips_code_fences(self):
+        lines = [
+            "[home](/) and ![cat](/images/cat.png)",
+            "",
+            "```",
+            "[not](/a-link)",
+            "```",
+        ]
+        self.assertEqual(
+            scan_references(lines),
+            [("image", "/images/cat.png"), ("link", "/")],
+        )
+
+    def test_resolve_reference(self):
+        self.assertEqual(self.resolve("/", self.post), (self.index, True))
+        self.assertEqual(self.resolve("/images/cat.png", self.post), (self.image, True))
+        self.assertEqual(self.resolve("../index.html", self.post), (self.index, True))
+        self.assertEqual(self.resolve("post", self.post), (self.post, True))
+        self.assertEqual(self.resolve("https://example.com", self.post), (None, True))
+        self.assertEqual(self.resolve("#top", self.post), (None, True))
+        self.assertEqual(self.resolve("/missing", self.post), (None, False))
+        self.assertEqual(self.resolve("../../outside", self.post), (None, False))
+
+    def record(self, graph, dest, source, references):
+        graph.record(dest, source, self.template, references, self.resolve)
+
+    def test_affected_returns_dependent_outputs(self):
+        graph = DependencyGraph()
+        self.record(graph, "docs/index.html", self.index, [])
+        self.record(
+            graph, "docs/blog/post.html", self.post, [("image", "/images/cat.png")]
+        )
+        self.assertEqual(graph.affected([self.image]), {"docs/blog/post.html"})
+        self.assertEqual(graph.affected([self.index]), {"docs/index.html"})
+        self.assertEqual(
+            graph.affected([self.template]), {"docs/index.html", "docs/blog/post.html"}
+        )
+
+        self.record(graph, "docs/blog/post.html", self.post, [])
+        self.assertEqual(graph.affected([self.image]), set())
+
+        graph.remove("docs/index.html")
+        self.assertEqual(graph.affected([BASEPATH_INPUT]), {"docs/blog/post.html"})
+
+    def test_set_basepath(self):
+        graph = DependencyGraph()
+        self.record(graph, "docs/index.html", self.index, [])
+        self.assertEqual(graph.set_basepath("/"), set())
+        self.assertEqual(graph.set_basepath("/"), set())
+        self.assertEqual(graph.set_basepath("/site/"), {"docs/index.html"})
+
+    def test_broken_references(self):
+        graph = DependencyGraph()
+        self.record(
+            graph,
+            "docs/blog/post.html",
+            self.post,
+            [("link", "/"), ("link", "/missing"), ("image", "/images/dog.png")],
+        )
+        self.assertEqual(
+            graph.broken_references(self.resolve),
+            {self.post: [("link", "/missing"), ("image", "/images/dog.png")]},
+        )
+
+    def test_save_and_load(self):
+        path = os.path.join(self.root, "graph.json")
+        graph = DependencyGraph(path)
+        self.record(
+            graph, "docs/blog/post.html", self.post, [("image", "/images/cat.png")]
+        )
+        graph.set_basepath("/")
+        graph.save()
+
+        loaded = DependencyGraph(path)
+        self.assertEqual(loaded.basepath, "/")
+        self.assertEqual(loaded.outputs, graph.outputs)
+        self.assertEqual(loaded.affected([self.image]), {"docs/blog/post.html"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from src.frontmatter import (
+    HEADER_SIZE,
+    MAX_HEADER_SIZE,
+    parse_date,
+    read_front_matter,
+    split_front_matter,
+)
+from src.render import read_page
+
+
+class TestFrontMatter(TestCase):
+    def test_yaml_front_matter(self):
+        source = (
+            b"---\n"
+            b"title: \"Hello: World\"\n"
+            b"# a comment\n"
+            b"date: 2024-05-01\n"
+            b"draft: yes\n"
+            b"slug: hello\n"
+            b"template: post.html\n"
+            b"---\n"
+            b"# Heading\n"
+        )
+        meta, offset = split_front_matter(source)
+        self.assertEqual(
+            meta,
+            {
+                "title": "Hello: World",
+                "date": "2024-05-01",
+                "draft": True,
+                "slug": "hello",
+                "template": "post.html",
+            },
+        )
+        self.assertEqual(source[offset:], b"# Heading\n")
+
+    def test_toml_front_matter_with_crlf(self):
+        source = b'+++\r\ntitle = "Notes"\r\ndraft = false\r\n+++\r\nbody'
+        meta, offset = split_front_matter(source)
+        self.assertEqual(meta, {"title": "Notes", "draft": False})
+        self.assertEqual(source[offset:], b"body")
+
+    def test_without_front_matter(self):
+        for source in (b"# Title\n---\n", b"----\nx\n----\n", b"--- \n"):
+            self.assertEqual(split_front_matter(source), ({}, 0))
+        self.assertEqual(split_front_matter(b"---\n---"), ({}, 7))
+
+    def test_invalid_front_matter(self):
+        for source in (
+            b"---\ntitle: x\n",
+            b"---\ntitle x\n---\n",
+            b"---\ndraft: maybe\n---\n",
+            b"---\ndate: yesterday\n---\n",
+            b"---\nslug: ../up\n---\n",
+        ):
+            with self.assertRaises(ValueError, msg=source):
+                split_front_matter(source)
+        self.assertIsNone(split_front_matter(b"---\ntitle: x\n", complete=False))
+
+    def test_parse_date(self):
+        self.assertEqual(
+            parse_date("2024-05-01").isoformat(), "2024-05-01T00:00:00+00:00"
+        )
+        self.assertEqual(
+            parse_date("2024-05-01T10:30:00+02:00").isoformat(),
+            "2024-05-01T10:30:00+02:00",
+        )
+
+    def test_read_front_matter_reads_past_the_first_block(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "page.md")
+            padding = "x" * HEADER_SIZE
+            with open(path, "w") as f:
+                f.write(f"---\nsummary: {padding}\ntitle: Long\n---\n# Body\n")
+            self.assertEqual(read_front_matter(path)["title"], "Long")
+
+            with open(path, "w") as f:
+                f.write("# Plain\n" + "text\n" * HEADER_SIZE)
+            self.assertEqual(read_front_matter(path), {})
+
+            with open(path, "w") as f:
+                f.write("---\n" + "key: value\n" * MAX_HEADER_SIZE)
+            with self.assertRaises(ValueError):
+                read_front_matter(path)
+
+    def test_read_page_uses_front_matter_title(self):
+        meta, title, nodes = read_page(b"---\ntitle: Meta\n---\n# Heading\n\nText")
+        self.assertEqual((meta, title), ({"title": "Meta"}, "Meta"))
+        self.assertEqual([node.tag for node in nodes], ["h1", "p"])
+        _, title, _ = read_page(b"---\n# not: a title\n---\nintro\n\n# Heading")
+        self.assertEqual(title, "Heading")
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from src.htmlnode import HTMLNode, LeafNode, ParentNode
@@ -73,6 +74,32 @@ class TestParentNode(unittest.TestCase):
             "<div><div1.0><b>ggch1.1</b><b>ggch1.2</b></div1.0><i>ch0.1</i><div2.0><b>ggch2.1</b></div2.0></div>",
         )
 
+    def test_write_html_matches_to_html(self):
+        node = ParentNode(
+            "ul",
+            [ParentNode("li", [LeafNode("b", "one")]), LeafNode("li", "two")],
+            {"class": "list"},
+        )
+        fp = io.StringIO()
+        node.write_html(fp)
+        self.assertEqual(fp.getvalue(), node.to_html())
+        self.assertEqual(
+            fp.getvalue(), '<ul class="list"><li><b>one</b></li><li>two</li></ul>'
+        )
+
+    def test_iter_html_deep_tree(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("blockquote", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<blockquote>" * 5000 + "x"))
+        self.assertTrue(html.endswith("</blockquote>" * 5000))
+
+    def test_iter_html_missing_children(self):
+        node = ParentNode("div", [ParentNode("p", [])])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
 
 if __name__ == "__main__":
     unittest.main()
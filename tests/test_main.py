@@ -1,5 +1,26 @@
+import gzip
+import os
+import tempfile
 from unittest import TestCase
-from src.main import extract_title
+
+from src.main import (
+    extract_title,
+    generate_pages,
+    page_dest_path,
+    check_references,
+    rebuild_changed,
+    templates_in_use,
+    update_dependency_graph,
+    write_site_outputs,
+)
+from src.compress import Compressor
+from src.depgraph import DependencyGraph
+from src.manifest import BuildManifest, hash_file
+from src.profiler import BuildProfile
+from src.render import extract_title_from_buffer
+from src.render_cache import RenderCache
+from src.search import SearchIndex
+from src.sitemodel import SiteModel
 
 class TestExtractTitle(TestCase):
     def test_extract_title_with_title(self):
@@ -12,3 +33,465 @@ class TestExtractTitle(TestCase):
         with self.assertRaises(Exception) as context:
             extract_title(markdown)
         self.assertEqual(str(context.exception), "No title found in markdown")
+
+    def test_extract_title_from_buffer(self):
+        for markdown in (
+            "# My Title\n\nbody",
+            "intro\r\n# My Title \r\n\n# Later",
+            "## Sub\n#NotATitle\n# My Title",
+        ):
+            self.assertEqual(extract_title_from_buffer(markdown.encode()), "My Title")
+        with self.assertRaises(Exception):
+            extract_title_from_buffer(b"## Sub\ntext")
+
+
+class TestGeneratePages(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        for i in range(6):
+            name = f"post{i}.md" if i % 2 else os.path.join("blog", f"post{i}.md")
+            with open(os.path.join(self.content, name), "w") as f:
+                f.write(f"# Post {i}\n\nSome **bold** [link](/x{i}) text\n\n- a\n- b")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_tree(self, root):
+        tree = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as f:
+                    tree[os.path.relpath(path, root)] = f.read()
+        return tree
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages(self.content, self.template, serial, "/base/")
+        generate_pages(self.content, self.template, parallel, "/base/", jobs=3)
+        self.assertEqual(len(self.read_tree(serial)), 6)
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_profiled_build_matches_plain_build(self):
+        plain = os.path.join(self.root, "plain")
+        profiled = os.path.join(self.root, "profiled")
+        profile = BuildProfile()
+        generate_pages(self.content, self.template, plain, "/")
+        generate_pages(self.content, self.template, profiled, "/", profile=profile)
+        self.assertEqual(self.read_tree(plain), self.read_tree(profiled))
+        self.assertEqual(len(profile.pages), 6)
+        self.assertEqual(
+            set(profile.stage_totals()),
+            {
+                "read",
+                "extract_title",
+                "template_fill",
+                "markdown_to_blocks",
+                "block_to_children",
+                "to_html",
+                "write",
+            },
+        )
+        page = profile.pages[os.path.join(self.content, "post1.md")]
+        self.assertGreater(page["counts"]["markdown_to_blocks"], 0)
+
+        cache = RenderCache(os.path.join(self.root, "cache"))
+        for run in ("miss", "hit"):
+            profile = BuildProfile()
+            dest = os.path.join(self.root, run)
+            stats = generate_pages(
+                self.content, self.template, dest, "/", profile=profile, cache=cache
+            )
+            self.assertEqual(self.read_tree(plain), self.read_tree(dest))
+        self.assertEqual(stats["cache_hits"], 6)
+        page = profile.pages[os.path.join(self.content, "post1.md")]
+        self.assertEqual(page["counts"]["cache"], 1)
+        self.assertNotIn("block_to_children", page["stages"])
+
+    def test_cached_build_matches_plain_build(self):
+        plain = os.path.join(self.root, "plain")
+        cache = RenderCache(os.path.join(self.root, "cache"))
+        generate_pages(self.content, self.template, plain, "/")
+        for run in ("miss", "hit"):
+            dest = os.path.join(self.root, run)
+            generate_pages(self.content, self.template, dest, "/", cache=cache)
+            self.assertEqual(self.read_tree(plain), self.read_tree(dest))
+        self.assertEqual((cache.hits, cache.misses), (6, 6))
+
+    def test_pipeline_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        generate_pages(self.content, self.template, serial, "/base/")
+        cache = RenderCache(os.path.join(self.root, "cache"))
+        hits = []
+        for jobs, run in ((1, "miss"), (1, "hit"), (2, "parallel")):
+            dest = os.path.join(self.root, run)
+            profile = BuildProfile()
+            stats = generate_pages(
+                self.content,
+                self.template,
+                dest,
+                "/base/",
+                jobs=jobs,
+                profile=profile,
+                cache=cache,
+                pipeline=True,
+            )
+            self.assertEqual(self.read_tree(serial), self.read_tree(dest))
+            self.assertEqual(stats["pages"], 6)
+            self.assertEqual(set(profile.stage_totals()), {"read", "render", "write"})
+            hits.append(stats.get("cache_hits", 0))
+        self.assertEqual(hits, [0, 6, 6])
+
+    def test_pipeline_reports_failures(self):
+        open(os.path.join(self.content, "empty.md"), "w").close()
+        with open(os.path.join(self.content, "broken.md"), "w") as f:
+            f.write("no title")
+        manifest = BuildManifest()
+        dest = os.path.join(self.root, "out")
+        with self.assertRaises(Exception) as context:
+            generate_pages(
+                self.content, self.template, dest, "/", manifest, pipeline=True
+            )
+        self.assertIn("2 page(s) failed", str(context.exception))
+        self.assertEqual(len(manifest.pages), 6)
+
+    def test_front_matter_pages_match_across_build_paths(self):
+        with open(os.path.join(self.content, "blog", "post2.md"), "w") as f:
+            f.write("---\ntitle: Meta Title\nslug: meta\n---\nNo heading here")
+        with open(os.path.join(self.content, "post3.md"), "w") as f:
+            f.write("---\ndraft: true\n---\n# Draft")
+        cache = RenderCache(os.path.join(self.root, "cache"))
+        trees = {}
+        for name, options in (
+            ("serial", {}),
+            ("parallel", {"jobs": 2}),
+            ("pipeline", {"pipeline": True}),
+            ("profiled", {"profile": BuildProfile()}),
+            ("cached", {"cache": cache}),
+            ("cache-hit", {"cache": cache}),
+        ):
+            dest = os.path.join(self.root, name)
+            generate_pages(self.content, self.template, dest, "/", **options)
+            trees[name] = self.read_tree(dest)
+        self.assertEqual(
+            trees["serial"][os.path.join("blog", "meta.html")],
+            b'<title>Meta Title</title><link href="/index.css">'
+            b"<div><p>No heading here</p></div>",
+        )
+        self.assertNotIn("post3.html", trees["serial"])
+        for name, tree in trees.items():
+            self.assertEqual(tree, trees["serial"], name)
+
+    def test_compressed_sidecars_match_pages(self):
+        with open(os.path.join(self.content, "post1.md"), "a") as f:
+            f.write("\n\nMore text to make compression worthwhile. " * 20)
+        for name, options in (
+            ("serial", {}),
+            ("parallel", {"jobs": 2}),
+            ("pipeline", {"pipeline": True}),
+        ):
+            dest = os.path.join(self.root, name)
+            compressor = Compressor(["gzip"])
+            generate_pages(
+                self.content, self.template, dest, "/", compressor=compressor, **options
+            )
+            compressor.wait()
+            tree = self.read_tree(dest)
+            sidecars = [path for path in tree if path.endswith(".gz")]
+            self.assertEqual(sidecars, ["post1.html.gz"], name)
+            for path in sidecars:
+                self.assertEqual(gzip.decompress(tree[path]), tree[path[:-3]])
+
+    def test_search_terms_match_across_build_paths(self):
+        cache = RenderCache(os.path.join(self.root, "cache"))
+        indexes = {}
+        for name, options in (
+            ("serial", {}),
+            ("parallel", {"jobs": 2}),
+            ("pipeline", {"pipeline": True}),
+            ("profiled", {"profile": BuildProfile()}),
+            ("cached", {"cache": cache}),
+            ("cache-hit", {"cache": cache}),
+        ):
+            search = SearchIndex()
+            dest = os.path.join(self.root, name)
+            generate_pages(
+                self.content, self.template, dest, "/", search=search, **options
+            )
+            indexes[name] = {
+                os.path.relpath(path, dest): entry["terms"]
+                for path, entry in search.pages.items()
+            }
+        terms = indexes["serial"][os.path.join("blog", "post0.html")]
+        self.assertEqual((terms["post"], terms["bold"]), (11, 1))
+        for name, index in indexes.items():
+            self.assertEqual(index, indexes["serial"], name)
+
+    def test_search_index_rebuilds_stale_entries(self):
+        dest = os.path.join(self.root, "docs")
+        manifest = BuildManifest()
+        manifest.configure(hash_file(self.template), "/")
+        generate_pages(self.content, self.template, dest, "/", manifest)
+        search = SearchIndex()
+        stats = generate_pages(
+            self.content, self.template, dest, "/", manifest, search=search
+        )
+        self.assertEqual(stats["pages"], 6)
+        stats = generate_pages(
+            self.content, self.template, dest, "/", manifest, search=search
+        )
+        self.assertNotIn("pages", stats)
+
+    def test_site_model_matches_across_build_paths(self):
+        cache = RenderCache(os.path.join(self.root, "cache"))
+        models = {}
+        for name, options in (
+            ("serial", {}),
+            ("parallel", {"jobs": 2}),
+            ("pipeline", {"pipeline": True}),
+            ("cached", {"cache": cache}),
+            ("cache-hit", {"cache": cache}),
+        ):
+            site = SiteModel()
+            dest = os.path.join(self.root, name)
+            generate_pages(
+                self.content, self.template, dest, "/", site=site, **options
+            )
+            models[name] = {
+                os.path.relpath(path, dest): (
+                    entry["url"],
+                    entry["title"],
+                    entry["summary"],
+                )
+                for path, entry in site.pages.items()
+            }
+        self.assertEqual(
+            models["serial"][os.path.join("blog", "post0.html")],
+            ("/blog/post0.html", "Post 0", "Some bold link text"),
+        )
+        for name, model in models.items():
+            self.assertEqual(model, models["serial"], name)
+
+    def test_site_outputs_are_rewritten_incrementally(self):
+        dest = os.path.join(self.root, "docs")
+        blog = os.path.join(dest, "blog")
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("# Home\n\nWelcome")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.configure(hash_file(self.template), "/")
+        site = SiteModel(os.path.join(self.root, "site.json"))
+        site.configure(manifest.template, "/", "https://example.com")
+        generate_pages(self.content, self.template, dest, "/", manifest, site=site)
+        self.assertEqual(write_site_outputs(site, self.template, dest, "/"), 3)
+        with open(os.path.join(blog, "index.html")) as f:
+            listing = f.read()
+        self.assertTrue(listing.startswith("<title>Blog</title>"))
+        self.assertIn('<a href="/blog/post4.html">Post 4</a>', listing)
+        self.assertFalse(os.path.exists(os.path.join(dest, "index.html.tmp")))
+        self.assertEqual(write_site_outputs(site, self.template, dest, "/"), 0)
+
+        os.remove(os.path.join(self.content, "blog", "post2.md"))
+        os.remove(os.path.join(self.content, "post1.md"))
+        rebuild_changed(
+            [],
+            [
+                os.path.join(self.content, "blog", "post2.md"),
+                os.path.join(self.content, "post1.md"),
+            ],
+            os.path.join(self.root, "static"),
+            self.content,
+            self.template,
+            dest,
+            "/",
+            manifest,
+            site=site,
+        )
+        with open(os.path.join(blog, "index.html")) as f:
+            listing = f.read()
+        self.assertNotIn("post2.html", listing)
+        with open(os.path.join(dest, "sitemap.xml")) as f:
+            sitemap = f.read()
+        self.assertNotIn("post1.html", sitemap)
+        self.assertIn("<loc>https://example.com/blog/</loc>", sitemap)
+
+        for name in ("post0.md", "post4.md"):
+            os.remove(os.path.join(self.content, "blog", name))
+            manifest.forget(os.path.join(blog, name.replace(".md", ".html")))
+        site.retain(manifest.pages)
+        write_site_outputs(site, self.template, dest, "/")
+        self.assertFalse(os.path.exists(os.path.join(blog, "index.html")))
+        self.assertEqual(site.listings, {})
+
+    def test_authored_index_fills_the_listing_slot(self):
+        dest = os.path.join(self.root, "docs")
+        section = os.path.join(self.root, "section.html")
+        with open(section, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}<nav>{{ Listing }}</nav>")
+        with open(os.path.join(self.content, "blog", "index.md"), "w") as f:
+            f.write("---\ntemplate: section.html\n---\n# Writing\n\nAll posts")
+        bundle = os.path.join(self.content, "blog", "bundle")
+        os.makedirs(bundle)
+        with open(os.path.join(bundle, "index.md"), "w") as f:
+            f.write("# Bundle\n\nA post with its own directory")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.configure(hash_file(self.template), "/")
+        site = SiteModel(os.path.join(self.root, "site.json"))
+        site.configure(manifest.template, "/", "https://example.com")
+        compressor = Compressor(["gzip"])
+        stats = generate_pages(
+            self.content,
+            self.template,
+            dest,
+            "/",
+            manifest,
+            jobs=2,
+            compressor=compressor,
+            site=site,
+        )
+        written = write_site_outputs(
+            site, self.template, dest, "/", compressor, stats["rebuilt"]
+        )
+        compressor.wait()
+        self.assertEqual(written, 3)
+        index = os.path.join(dest, "blog", "index.html")
+        self.assertEqual(stats["rebuilt"].count(index), 1)
+        with open(index) as f:
+            page = f.read()
+        with gzip.open(index + ".gz", "rt") as f:
+            self.assertEqual(f.read(), page)
+        self.assertTrue(page.startswith("<title>Writing</title><div><h1>Writing"))
+        self.assertIn('<nav><ul class="listing">', page)
+        self.assertIn('<a href="/blog/bundle/index.html">Bundle</a>', page)
+        self.assertIn('<a href="/blog/post4.html">Post 4</a>', page)
+        self.assertEqual(site.listings, {dest: os.path.join(dest, "index.html")})
+
+        with open(os.path.join(dest, "feed.xml")) as f:
+            feed = f.read()
+        self.assertIn("<title>Bundle</title>", feed)
+        self.assertNotIn("<title>Writing</title>", feed)
+
+        os.remove(os.path.join(self.content, "blog", "post2.md"))
+        rebuild_changed(
+            [],
+            [os.path.join(self.content, "blog", "post2.md")],
+            os.path.join(self.root, "static"),
+            self.content,
+            self.template,
+            dest,
+            "/",
+            manifest,
+            site=site,
+        )
+        with open(index) as f:
+            page = f.read()
+        self.assertNotIn("post2.html", page)
+        self.assertIn("post4.html", page)
+
+    def test_page_templates_are_tracked_and_rebuilt(self):
+        static = os.path.join(self.root, "static")
+        dest = os.path.join(self.root, "docs")
+        os.makedirs(static)
+        alt = os.path.join(self.root, "alt.html")
+        with open(alt, "w") as f:
+            f.write("<main>{{ Content }}</main>")
+        page = os.path.join(self.content, "post1.md")
+        with open(page, "w") as f:
+            f.write("---\ntemplate: alt.html\n---\n# Alt")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.configure(hash_file(self.template), "/")
+        stats = generate_pages(self.content, self.template, dest, "/", manifest)
+        self.assertEqual(
+            templates_in_use(manifest, self.template), {self.template, alt}
+        )
+
+        alt_page = os.path.join(dest, "post1.html")
+        built = DependencyGraph()
+        update_dependency_graph(
+            built, manifest, stats["rebuilt"], [], self.content, static, self.template
+        )
+        checked = DependencyGraph()
+        check_references(checked, manifest, self.content, static, self.template, dest)
+        for graph in (built, checked):
+            self.assertEqual(graph.affected([alt]), {alt_page})
+            self.assertNotIn(alt_page, graph.affected([self.template]))
+
+        for name in ("post1.html", "post3.html"):
+            os.utime(os.path.join(dest, name), ns=(0, 0))
+        with open(alt, "w") as f:
+            f.write("<section>{{ Content }}</section>")
+        rebuild_changed(
+            [alt], [], static, self.content, self.template, dest, "/", manifest
+        )
+        with open(alt_page) as f:
+            self.assertEqual(f.read(), "<section><div><h1>Alt</h1></div></section>")
+        self.assertEqual(os.stat(os.path.join(dest, "post3.html")).st_mtime_ns, 0)
+
+    def test_check_references_leaves_the_output_alone(self):
+        dest = os.path.join(self.root, "docs")
+        broken = check_references(
+            DependencyGraph(),
+            BuildManifest(),
+            self.content,
+            os.path.join(self.root, "static"),
+            self.template,
+            dest,
+        )
+        self.assertEqual(len(broken), 6)
+        self.assertFalse(os.path.exists(dest))
+
+    def test_parallel_reports_failures(self):
+        with open(os.path.join(self.content, "broken.md"), "w") as f:
+            f.write("no title")
+        with self.assertRaises(Exception) as context:
+            generate_pages(
+                self.content, self.template, os.path.join(self.root, "out"), "/", jobs=2
+            )
+        self.assertIn("1 page(s) failed", str(context.exception))
+
+    def test_page_dest_path(self):
+        self.assertEqual(
+            page_dest_path("content", "docs", os.path.join("content", "blog", "a.md")),
+            os.path.join("docs", "blog", "a.html"),
+        )
+
+    def test_rebuild_changed_only_touches_affected_outputs(self):
+        static = os.path.join(self.root, "static")
+        dest = os.path.join(self.root, "docs")
+        os.makedirs(static)
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.configure(hash_file(self.template), "/")
+        generate_pages(self.content, self.template, dest, "/", manifest)
+        for name in os.listdir(os.path.join(dest, "blog")):
+            os.utime(os.path.join(dest, "blog", name), ns=(0, 0))
+
+        changed_page = os.path.join(self.content, "blog", "post0.md")
+        removed_page = os.path.join(self.content, "blog", "post2.md")
+        asset = os.path.join(static, "site.css")
+        with open(changed_page, "w") as f:
+            f.write("# Updated\n\nnew text")
+        with open(asset, "w") as f:
+            f.write("body {}")
+        os.remove(removed_page)
+
+        rebuild_changed(
+            [changed_page, asset],
+            [removed_page],
+            static,
+            self.content,
+            self.template,
+            dest,
+            "/",
+            manifest,
+        )
+        blog = os.path.join(dest, "blog")
+        self.assertNotEqual(os.stat(os.path.join(blog, "post0.html")).st_mtime_ns, 0)
+        self.assertEqual(os.stat(os.path.join(blog, "post4.html")).st_mtime_ns, 0)
+        self.assertFalse(os.path.exists(os.path.join(blog, "post2.html")))
+        self.assertTrue(os.path.exists(os.path.join(dest, "site.css")))
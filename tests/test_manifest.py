@@ -0,0 +1,166 @@
+import os
+import tempfile
+import unittest
+
+from src.compress import Compressor
+from src.main import generate_pages
+from src.manifest import BuildManifest, hash_file
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        os.makedirs(self.content)
+        os.makedirs(self.dest)
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.write_page("index.md", "# Home\n\nHello")
+        self.write_page("about.md", "# About\n\nWorld")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_page(self, name, text):
+        with open(os.path.join(self.content, name), "w") as f:
+            f.write(text)
+
+    def build(self, basepath="/", compressor=None, drafts=False):
+        manifest = BuildManifest(self.manifest_path)
+        compression = compressor.formats if compressor else ()
+        manifest.configure(hash_file(self.template), basepath, compression)
+        generate_pages(
+            self.content,
+            self.template,
+            self.dest,
+            basepath,
+            manifest,
+            compressor=compressor,
+            drafts=drafts,
+        )
+        if compressor:
+            compressor.wait()
+        manifest.prune()
+        manifest.save()
+        return manifest
+
+    def output_mtimes(self):
+        return {
+            name: os.stat(os.path.join(self.dest, name)).st_mtime_ns
+            for name in os.listdir(self.dest)
+        }
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        before = self.output_mtimes()
+        self.write_page("about.md", "# About\n\nChanged")
+        os.utime(os.path.join(self.dest, "index.html"), ns=(0, 0))
+        self.build()
+        after = self.output_mtimes()
+        self.assertEqual(after["index.html"], 0)
+        self.assertNotEqual(after["about.html"], before["about.html"])
+        with open(os.path.join(self.dest, "about.html")) as f:
+            self.assertIn("Changed", f.read())
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_removed_source_deletes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "about.md"))
+        manifest = self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "about.html")))
+        self.assertNotIn(os.path.join(self.dest, "about.html"), manifest.pages)
+
+    def test_drafts_are_skipped_and_removed(self):
+        self.build()
+        self.write_page("about.md", "---\ndraft: true\n---\n# About\n\nSoon")
+        manifest = self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "about.html")))
+        self.assertEqual(list(manifest.pages), [os.path.join(self.dest, "index.html")])
+        self.build(drafts=True)
+        with open(os.path.join(self.dest, "about.html")) as f:
+            self.assertIn("<p>Soon</p>", f.read())
+
+    def test_slug_moves_output(self):
+        self.build()
+        self.write_page("about.md", "---\nslug: team\ntitle: Team\n---\nWho we are")
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "about.html")))
+        with open(os.path.join(self.dest, "team.html")) as f:
+            self.assertEqual(f.read(), "<title>Team</title><div><p>Who we are</p></div>")
+
+        self.write_page("index.md", "---\nslug: team\n---\n# Home")
+        with self.assertRaises(Exception) as context:
+            self.build()
+        self.assertIn("both generate", str(context.exception))
+
+    def test_page_template_changes_rebuild_its_pages(self):
+        post_template = os.path.join(self.root, "post.html")
+        with open(post_template, "w") as f:
+            f.write("<article>{{ Content }}</article>")
+        self.write_page("about.md", "---\ntemplate: post.html\n---\n# About")
+        self.build()
+        os.utime(os.path.join(self.dest, "index.html"), ns=(0, 0))
+        self.build()
+        self.assertEqual(self.output_mtimes()["index.html"], 0)
+
+        with open(post_template, "w") as f:
+            f.write("<main>{{ Content }}</main>")
+        self.build()
+        with open(os.path.join(self.dest, "about.html")) as f:
+            self.assertEqual(f.read(), "<main><div><h1>About</h1></div></main>")
+        self.assertEqual(self.output_mtimes()["index.html"], 0)
+
+    def test_front_matter_is_read_once_per_change(self):
+        about = os.path.join(self.content, "about.md")
+        self.write_page("about.md", "---\ntitle: One\n---\nx")
+        stat = os.stat(about)
+        manifest = self.build()
+        self.assertEqual(manifest.front_matter[about]["meta"], {"title": "One"})
+
+        self.write_page("about.md", "---\ntitle: Two\n---\nx")
+        os.utime(about, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        manifest = self.build()
+        self.assertEqual(manifest.front_matter[about]["meta"], {"title": "One"})
+
+        os.utime(about)
+        manifest = self.build()
+        self.assertEqual(manifest.front_matter[about]["meta"], {"title": "Two"})
+
+        os.remove(about)
+        manifest = self.build()
+        self.assertNotIn(about, manifest.front_matter)
+
+    def test_basepath_change_rebuilds_everything(self):
+        self.build()
+        os.utime(os.path.join(self.dest, "index.html"), ns=(0, 0))
+        self.build("/site/")
+        self.assertNotEqual(self.output_mtimes()["index.html"], 0)
+
+
+    def test_compression_change_rebuilds_and_sidecars_follow_pages(self):
+        self.write_page("index.md", "# Home\n\n" + "Hello there. " * 100)
+        self.build()
+        sidecar = os.path.join(self.dest, "index.html.gz")
+        self.build(compressor=Compressor(["gzip"]))
+        self.assertTrue(os.path.exists(sidecar))
+        self.assertNotIn("about.html.gz", os.listdir(self.dest))
+
+        self.build()
+        self.assertFalse(os.path.exists(sidecar))
+
+        self.build(compressor=Compressor(["gzip"]))
+        os.remove(os.path.join(self.content, "index.md"))
+        self.build(compressor=Compressor(["gzip"]))
+        self.assertFalse(os.path.exists(sidecar))
+
+if __name__ == "__main__":
+    unittest.main()
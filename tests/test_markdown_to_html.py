@@ -1,3 +1,4 @@
+import io
 import unittest
 from src.textnode import TextNode, TextType
 from src.markdown_to_html import (
@@ -8,9 +9,15 @@ from src.markdown_to_html import (
     split_nodes_link,
     text_to_textnodes,
     markdown_to_blocks,
+    iter_blocks,
+    iter_block_nodes,
     block_to_blocktype,
+    classify_block,
     markdown_to_html_node,
+    configure_inline_memo,
+    inline_memo_stats,
     BlockType,
+    ORDERED_PREFIXES,
 )
 
 
@@ -178,6 +185,67 @@ class TextToTextNode(unittest.TestCase):
         )
 
 
+    def test_text_to_textnodes_underscore_in_code(self):
+        nodes = text_to_textnodes("Call `snake_case_name` here")
+        self.assertEqual(
+            nodes,
+            [
+                TextNode("Call ", TextType.TEXT),
+                TextNode("snake_case_name", TextType.CODE),
+                TextNode(" here", TextType.TEXT),
+            ],
+        )
+
+    def test_text_to_textnodes_underscore_in_url(self):
+        nodes = text_to_textnodes("See [docs](http://a.com/my_page_here) now")
+        self.assertEqual(
+            nodes,
+            [
+                TextNode("See ", TextType.TEXT),
+                TextNode("docs", TextType.LINK, "http://a.com/my_page_here"),
+                TextNode(" now", TextType.TEXT),
+            ],
+        )
+
+    def test_text_to_textnodes_unmatched_delimiter(self):
+        with self.assertRaises(Exception) as context:
+            text_to_textnodes("This is **bold and not closed")
+        self.assertTrue("umatched delimiter" in str(context.exception))
+
+    def test_text_to_textnodes_delimiter_in_url_does_not_close(self):
+        nodes = text_to_textnodes("snake_case [x](/a_b) and_more")
+        self.assertEqual(
+            nodes,
+            [
+                TextNode("snake", TextType.TEXT),
+                TextNode("case [x](/a_b) and", TextType.ITALIC),
+                TextNode("more", TextType.TEXT),
+            ],
+        )
+        nodes = text_to_textnodes("snake_case [x](/a_b) z", strict=False)
+        self.assertEqual(
+            nodes,
+            [
+                TextNode("snake_case ", TextType.TEXT),
+                TextNode("x", TextType.LINK, "/a_b"),
+                TextNode(" z", TextType.TEXT),
+            ],
+        )
+
+    def test_text_to_textnodes_delimiter_in_code_does_not_close(self):
+        nodes = text_to_textnodes("**a `**` b** c")
+        self.assertEqual(
+            nodes,
+            [
+                TextNode("a `**` b", TextType.BOLD),
+                TextNode(" c", TextType.TEXT),
+            ],
+        )
+
+    def test_text_to_textnodes_unclosed_bracket_is_text(self):
+        nodes = text_to_textnodes("a [b and ![c")
+        self.assertEqual(nodes, [TextNode("a [b and ![c", TextType.TEXT)])
+
 class MarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
         md = """
@@ -218,6 +286,28 @@ This is the same paragraph on a new line
         blocks = markdown_to_blocks(md)
         self.assertEqual(blocks, ["Here is a list:", "- Item 1\n- Item 2\n- Item 3"])
 
+    def test_markdown_to_blocks_code_fence_with_blank_lines(self):
+        md = "Intro\n\n```\ndef f():\n\n    return 1\n```\n\nOutro"
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(
+            blocks, ["Intro", "```\ndef f():\n\n    return 1\n```", "Outro"]
+        )
+
+    def test_markdown_to_blocks_inline_fence(self):
+        md = "```single line```\n\nafter"
+        self.assertEqual(markdown_to_blocks(md), ["```single line```", "after"])
+
+    def test_iter_blocks_from_stream(self):
+        stream = io.StringIO("# Title\r\n\r\n- a\n- b\n\n\n\nend\n")
+        self.assertEqual(list(iter_blocks(stream)), ["# Title", "- a\n- b", "end"])
+
+    def test_iter_block_nodes(self):
+        stream = io.StringIO("# Title\n\n```\nx\n\ny\n```\n")
+        html = [node.to_html() for node in iter_block_nodes(stream)]
+        self.assertEqual(
+            html, ["<h1>Title</h1>", "<pre><code>\nx\n\ny\n</code></pre>"]
+        )
+
 
 class BlockToBlocktype(unittest.TestCase):
     def test_block_to_blocktype_paragraph(self):
@@ -250,6 +340,47 @@ class BlockToBlocktype(unittest.TestCase):
         block_type = block_to_blocktype(block)
         self.assertEqual(block_type, BlockType.ORDERED_LIST)
 
+class ClassifyBlock(unittest.TestCase):
+    def test_heading_levels(self):
+        for level in range(1, 7):
+            self.assertEqual(
+                classify_block("#" * level + " Title"),
+                (BlockType.HEADING, level, None),
+            )
+        for block in ("####### Seven", "#NoSpace", "#"):
+            self.assertEqual(classify_block(block), (BlockType.PARAGRAPH, 0, None))
+
+    def test_list_and_quote_items(self):
+        self.assertEqual(
+            classify_block("> first\n>second"),
+            (BlockType.QUOTE, 0, ["first", "second"]),
+        )
+        self.assertEqual(
+            classify_block("- a\n- b c"),
+            (BlockType.UNORDERED_LIST, 0, ["a", "b c"]),
+        )
+        self.assertEqual(
+            classify_block("1. one\n2. two. too"),
+            (BlockType.ORDERED_LIST, 0, ["one", "two. too"]),
+        )
+        self.assertEqual(classify_block("- a\nb"), (BlockType.PARAGRAPH, 0, None))
+        self.assertEqual(
+            classify_block("1. one\n3. three"), (BlockType.PARAGRAPH, 0, None)
+        )
+        self.assertEqual(classify_block("```\ncode\n```"), (BlockType.CODE, 0, None))
+
+    def test_ordered_lists_longer_than_the_prefix_table(self):
+        count = len(ORDERED_PREFIXES) + 5
+        block = "\n".join(f"{i}. item {i}" for i in range(1, count + 1))
+        blocktype, level, items = classify_block(block)
+        self.assertEqual((blocktype, level), (BlockType.ORDERED_LIST, 0))
+        self.assertEqual(len(items), count)
+        self.assertEqual(items[-1], f"item {count}")
+
+        misnumbered = block.replace(f"{count}. item", f"{count + 1}. item")
+        self.assertEqual(classify_block(misnumbered), (BlockType.PARAGRAPH, 0, None))
+
+
 class MarkdownToHTMLNode(unittest.TestCase):
     def test_paragraphs(self):
         md = """
@@ -328,8 +459,61 @@ the **same** even with inline stuff```
         html_node = markdown_to_html_node(md)
         expected_html = '<div><p>This is <b>bold</b> text with an <img src="http://img.url" alt="image"> and a <a href="http://link.url">link</a>.</p></div>'
         self.assertEqual(html_node.to_html(), expected_html)
-    
 
+    def test_markdown_to_html_node_bold_inside_link(self):
+        md = "Read [the **full** guide](/guide) first"
+        html_node = markdown_to_html_node(md)
+        expected_html = '<div><p>Read <a href="/guide">the <b>full</b> guide</a> first</p></div>'
+        self.assertEqual(html_node.to_html(), expected_html)
+
+
+
+    def test_markdown_to_html_node_link_inside_bold(self):
+        html_node = markdown_to_html_node("**see [docs](/u)**")
+        expected_html = '<div><p><b>see <a href="/u">docs</a></b></p></div>'
+        self.assertEqual(html_node.to_html(), expected_html)
+
+    def test_markdown_to_html_node_italic_inside_bold(self):
+        html_node = markdown_to_html_node("**a _b_ c** and _d [e_f](/g_h)_")
+        expected_html = (
+            '<div><p><b>a <i>b</i> c</b> and <i>d <a href="/g_h">e_f</a></i></p></div>'
+        )
+        self.assertEqual(html_node.to_html(), expected_html)
+
+    def test_markdown_to_html_node_delimiter_in_url(self):
+        html_node = markdown_to_html_node("snake_case [x](/a_b) and_more")
+        expected_html = (
+            '<div><p>snake<i>case <a href="/a_b">x</a> and</i>more</p></div>'
+        )
+        self.assertEqual(html_node.to_html(), expected_html)
+
+
+class InlineMemo(unittest.TestCase):
+    def tearDown(self):
+        configure_inline_memo()
+
+    def test_memo_output_matches_uncached(self):
+        md = (
+            "# Installation\n\n- [Home](/)\n- [Blog](/blog)\n- [Home](/)\n\n"
+            "Some **bold** and _italic_ text with `code`.\n\n"
+            "> Some **bold** and _italic_ text with `code`.\n\n"
+            "1. [the **full** guide](/guide)\n2. ![img](/a.png)"
+        )
+        configure_inline_memo(0)
+        uncached = markdown_to_html_node(md).to_html()
+        configure_inline_memo()
+        self.assertEqual(markdown_to_html_node(md).to_html(), uncached)
+        self.assertEqual(markdown_to_html_node(md).to_html(), uncached)
+
+    def test_memo_counts_hits(self):
+        configure_inline_memo()
+        markdown_to_html_node("- same\n- same\n- other")
+        self.assertEqual(inline_memo_stats(), (1, 2))
+
+    def test_memo_disabled(self):
+        configure_inline_memo(0)
+        markdown_to_html_node("- same\n- same")
+        self.assertEqual(inline_memo_stats(), (0, 0))
 
 
 if __name__ == "__main__":
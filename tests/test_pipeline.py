@@ -0,0 +1,77 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.pipeline import run_pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    def test_runs_every_job_through_each_stage(self):
+        results = {}
+
+        def done(job, value, error):
+            results[job] = error or value
+
+        with ThreadPoolExecutor(4) as pool:
+            run_pipeline(
+                range(50),
+                [
+                    (lambda job, _: job * 2, pool, 3),
+                    (lambda job, value: value + 1, pool, 2),
+                ],
+                done,
+                depth=2,
+            )
+        self.assertEqual(results, {job: job * 2 + 1 for job in range(50)})
+
+    def test_failures_skip_later_stages(self):
+        seen = []
+        results = {}
+
+        def check(job, _):
+            if job % 3 == 0:
+                raise ValueError(f"bad {job}")
+            return job
+
+        def record(job, value):
+            seen.append(job)
+            return value
+
+        def done(job, value, error):
+            results[job] = error
+
+        with ThreadPoolExecutor(2) as pool:
+            run_pipeline(range(9), [(check, pool, 2), (record, pool, 1)], done)
+        self.assertEqual(sorted(seen), [1, 2, 4, 5, 7, 8])
+        self.assertEqual(str(results[3]), "bad 3")
+        self.assertIsNone(results[4])
+
+    def test_bounded_queues_apply_backpressure(self):
+        started = []
+        release = threading.Event()
+        in_flight = []
+
+        def read(job, _):
+            started.append(job)
+            return job
+
+        def write(job, value):
+            release.wait(5)
+            return value
+
+        def unblock():
+            in_flight.append(len(started))
+            release.set()
+
+        timer = threading.Timer(0.2, unblock)
+        timer.start()
+        with ThreadPoolExecutor(2) as pool:
+            run_pipeline(
+                range(100), [(read, pool, 1), (write, pool, 1)], lambda *_: None, depth=2
+            )
+        self.assertEqual(len(started), 100)
+        self.assertLess(in_flight[0], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
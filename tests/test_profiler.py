@@ -0,0 +1,43 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from src.profiler import BuildProfile, PageProfile
+
+
+class TestProfiler(unittest.TestCase):
+    def test_page_profile_accumulates_stages(self):
+        profile = PageProfile()
+        profile.mark("read", 10)
+        profile.mark("read", 5)
+        profile.mark("write")
+        data = profile.to_dict()
+        self.assertEqual(set(data["stages"]), {"read", "write"})
+        self.assertEqual(data["counts"], {"read": 15})
+
+    def test_report_and_summary(self):
+        build = BuildProfile()
+        build.add_page("a.md", {"stages": {"read": 0.1, "write": 0.2}, "counts": {}})
+        build.add_page("b.md", {"stages": {"read": 0.3, "write": 0.1}, "counts": {}})
+        build.add_page("c.md", None)
+        self.assertEqual(set(build.pages), {"a.md", "b.md"})
+        self.assertAlmostEqual(build.stage_totals()["read"], 0.4)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.json")
+            build.write_report(path)
+            with open(path) as f:
+                self.assertEqual(set(json.load(f)["pages"]), {"a.md", "b.md"})
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            build.print_summary(top=1)
+        self.assertIn("b.md", out.getvalue())
+        self.assertNotIn("a.md", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
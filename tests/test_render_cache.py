@@ -0,0 +1,61 @@
+import io
+import os
+import re
+import tempfile
+import unittest
+
+from src.htmlnode import LeafNode, ParentNode
+from src.render_cache import RENDERER_MODULES, CachedContent, RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RenderCache(os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("abc"))
+        with self.cache.open_entry("abc", "Title") as fp:
+            fp.write("<div>body\n</div>")
+        self.assertEqual(self.cache.get("abc"), ("Title", "<div>body\n</div>"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_failed_entry_is_not_stored(self):
+        with self.assertRaises(ValueError):
+            with self.cache.open_entry("abc", "Title") as fp:
+                fp.write("<div>")
+                raise ValueError("render failed")
+        self.assertIsNone(self.cache.get("abc"))
+
+    def test_cached_content_tees_output(self):
+        page = io.StringIO()
+        with self.cache.open_entry("abc", "T") as fp:
+            CachedContent(ParentNode("p", [LeafNode(None, "x")]), fp).write_html(page)
+        self.assertEqual(page.getvalue(), "<p>x</p>")
+        self.assertEqual(self.cache.get("abc"), ("T", "<p>x</p>"))
+
+    def test_version_covers_every_page_rendering_module(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with open(os.path.join(root, "src", "render.py")) as f:
+            imported = set(re.findall(r"^    from \.(\w+) import", f.read(), re.M))
+        # templates are filled after the cache, so they never change an entry
+        imported.discard("template")
+        modules = {f"{name}.py" for name in imported}
+        self.assertLessEqual(modules, set(RENDERER_MODULES))
+
+    def test_trim_evicts_least_recently_used(self):
+        for i, key in enumerate(["old", "mid", "new"]):
+            with self.cache.open_entry(key, "T") as fp:
+                fp.write("x" * 100)
+            os.utime(self.cache.entry_path(key), ns=(i, i))
+        self.cache.max_bytes = 250
+        self.assertEqual(self.cache.trim(), 1)
+        self.assertIsNone(self.cache.get("old"))
+        self.assertIsNotNone(self.cache.get("mid"))
+
+
+if __name__ == "__main__":
+    unittest.main()
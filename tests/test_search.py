@@ -0,0 +1,174 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from src.markdown_to_html import configure_inline_memo, markdown_to_html_node
+from src.search import (
+    SEARCH_BUCKETS,
+    PageText,
+    SearchIndex,
+    decode_postings,
+    encode_postings,
+    summarize,
+    term_bucket,
+    tokenize,
+)
+
+MARKDOWN = """# Getting Started
+
+Install the **static** generator with [pip](https://example.com/pip).
+
+## Configure Themes
+
+- pick a _theme_
+- set `basepath`
+
+![diagram](/images/flow.png)
+
+```
+run build
+```"""
+
+
+class TestPageText(TestCase):
+    def tearDown(self):
+        configure_inline_memo()
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("Hello, World! a x2 Ünïcode"),
+            ["hello", "world", "x2", "ünïcode"],
+        )
+        self.assertEqual(tokenize("z" * 33), [])
+
+    def test_title_and_headings_are_weighted(self):
+        terms = PageText()
+        terms.add_title("Getting Started")
+        for node in markdown_to_html_node(MARKDOWN).children:
+            terms.add_node(node)
+        self.assertEqual(terms.title, "Getting Started")
+        self.assertEqual(terms.weights["started"], 11)
+        self.assertEqual(terms.weights["themes"], 3)
+        self.assertEqual(terms.weights["pip"], 1)
+        self.assertEqual(terms.weights["basepath"], 1)
+        self.assertEqual(terms.weights["build"], 1)
+        self.assertNotIn("example", terms.weights)
+        self.assertNotIn("diagram", terms.weights)
+
+    def test_nodes_and_html_give_the_same_terms(self):
+        for memo_size in (0, 128):
+            configure_inline_memo(memo_size)
+            node = markdown_to_html_node(MARKDOWN)
+            from_nodes = PageText()
+            for child in node.children:
+                from_nodes.add_node(child)
+            from_html = PageText()
+            from_html.add_html(node.to_html())
+            self.assertEqual(from_nodes.weights, from_html.weights)
+
+    def test_summary_is_the_first_paragraph(self):
+        node = markdown_to_html_node(MARKDOWN)
+        for add in ("nodes", "html"):
+            text = PageText(terms=False)
+            if add == "nodes":
+                self.assertEqual(list(text.watch(node.children)), node.children)
+            else:
+                text.add_html(node.to_html())
+            self.assertEqual(text.summary, "Install the static generator with pip.")
+            self.assertEqual(text.weights, {})
+        self.assertEqual(summarize("one two  three", 9), "one two…")
+        self.assertEqual(summarize("x" * 12, 9), "x" * 9 + "…")
+
+    def test_watch_passes_nodes_through(self):
+        terms = PageText()
+        children = markdown_to_html_node(MARKDOWN).children
+        self.assertEqual(list(terms.watch(iter(children))), children)
+        self.assertIn("themes", terms.weights)
+
+
+class TestSearchIndex(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state = os.path.join(self.tmp.name, "search.json")
+        self.out = os.path.join(self.tmp.name, "search")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load_index(self):
+        with open(os.path.join(self.out, "docs.json")) as f:
+            docs = json.load(f)["docs"]
+        index = {}
+        for bucket in range(SEARCH_BUCKETS):
+            with open(os.path.join(self.out, f"terms-{bucket:02x}.json")) as f:
+                for term, encoded in json.load(f).items():
+                    self.assertEqual(term_bucket(term), bucket)
+                    index[term] = {
+                        docs[doc_id][0]: weight
+                        for doc_id, weight in decode_postings(encoded).items()
+                    }
+        return index
+
+    def test_postings_are_delta_encoded(self):
+        postings = {7: 1, 2: 3, 12: 2}
+        self.assertEqual(encode_postings(postings), [2, 3, 5, 1, 5, 2])
+        self.assertEqual(decode_postings(encode_postings(postings)), postings)
+
+    def test_write_and_reload(self):
+        search = SearchIndex(self.state)
+        search.update("docs/a.html", "/a.html", "A", "h1", {"alpha": 8, "shared": 1})
+        search.update("docs/b.html", "/b.html", "B", "h2", {"beta": 8, "shared": 2})
+        self.assertEqual(search.write(self.out), SEARCH_BUCKETS + 1)
+        search.save()
+        self.assertEqual(
+            self.load_index(),
+            {
+                "alpha": {"/a.html": 8},
+                "beta": {"/b.html": 8},
+                "shared": {"/a.html": 1, "/b.html": 2},
+            },
+        )
+
+        reloaded = SearchIndex(self.state)
+        self.assertEqual(reloaded.pages, search.pages)
+        self.assertEqual(reloaded.postings, search.postings)
+        self.assertTrue(reloaded.is_current("docs/a.html", "h1"))
+        self.assertFalse(reloaded.is_current("docs/a.html", "other"))
+        self.assertEqual(reloaded.write(self.out), 0)
+
+    def test_update_rewrites_only_touched_buckets(self):
+        search = SearchIndex()
+        search.update("docs/a.html", "/a.html", "A", "h1", {"alpha": 1, "shared": 1})
+        search.update("docs/b.html", "/b.html", "B", "h2", {"beta": 1, "shared": 1})
+        search.write(self.out)
+
+        search.update("docs/a.html", "/a.html", "A", "h1", {"alpha": 1, "shared": 1})
+        self.assertEqual(search.write(self.out), 0)
+        search.update("docs/a.html", "/a.html", "A", "h3", {"alpha": 2, "gamma": 1})
+        touched = {term_bucket(term) for term in ("alpha", "shared", "gamma")}
+        self.assertEqual(search.dirty_buckets, touched)
+        self.assertFalse(search.docs_changed)
+        self.assertEqual(search.write(self.out), len(touched))
+        self.assertEqual(
+            self.load_index(),
+            {
+                "alpha": {"/a.html": 2},
+                "beta": {"/b.html": 1},
+                "gamma": {"/a.html": 1},
+                "shared": {"/b.html": 1},
+            },
+        )
+
+    def test_removed_ids_are_reused(self):
+        search = SearchIndex()
+        for name in "abc":
+            dest_path = f"docs/{name}.html"
+            search.update(dest_path, f"/{name}.html", name, name, {name * 2: 1})
+        search.retain(["docs/a.html", "docs/c.html"])
+        self.assertNotIn("bb", search.postings)
+        search.update("docs/d.html", "/d.html", "d", "d", {"dd": 1})
+        self.assertEqual(search.pages["docs/d.html"]["id"], 1)
+        self.assertEqual(search.next_id, 3)
+        search.write(self.out)
+        self.assertEqual(set(self.load_index()), {"aa", "cc", "dd"})
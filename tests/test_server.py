@@ -0,0 +1,107 @@
+import http.client
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from src.render_cache import RenderCache
+from src.server import RenderService, make_server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+class TestRenderServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        with open(os.path.join(self.content, "blog", "post.md"), "w") as f:
+            f.write("# Post\n\nSome **bold** text")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><a href="/">{{ Content }}</a>')
+        cache = RenderCache(os.path.join(self.root, "cache"))
+        self.service = RenderService(self.template, "/base/", self.content, cache)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def serve(self, **options):
+        server = make_server(self.service, threads=4, **options)
+        server.quiet = True
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def request(self, connection, method, path, body=None):
+        connection.request(method, path, body)
+        response = connection.getresponse()
+        return response.status, response.read().decode()
+
+    def test_http_api(self):
+        server = self.serve(port=0)
+        connection = http.client.HTTPConnection(*server.server_address)
+        self.addCleanup(connection.close)
+
+        self.assertEqual(self.request(connection, "GET", "/health"), (200, "ok\n"))
+        self.assertEqual(
+            self.request(connection, "POST", "/render?body=1", b"# Hi\n\n_x_"),
+            (200, "<div><h1>Hi</h1><p><i>x</i></p></div>"),
+        )
+        self.assertEqual(
+            self.request(connection, "POST", "/render", b"# Hi"),
+            (200, '<title>Hi</title><a href="/base/"><div><h1>Hi</h1></div></a>'),
+        )
+        self.assertEqual(
+            self.request(connection, "POST", "/render", b"---\ntitle: Meta\n---\nx"),
+            (200, '<title>Meta</title><a href="/base/"><div><p>x</p></div></a>'),
+        )
+        for _ in range(2):
+            status, html = self.request(
+                connection, "GET", "/render?path=blog/post.md"
+            )
+            self.assertEqual(status, 200)
+            self.assertIn("<b>bold</b>", html)
+        self.assertEqual(self.service.cache.hits, 1)
+
+        self.assertEqual(self.request(connection, "POST", "/render", b"x")[0], 422)
+        self.assertEqual(
+            self.request(connection, "GET", "/render?path=../template.html")[0], 403
+        )
+        self.assertEqual(self.request(connection, "GET", "/render?path=no.md")[0], 404)
+
+    def test_template_reload(self):
+        server = self.serve(port=0)
+        connection = http.client.HTTPConnection(*server.server_address)
+        self.addCleanup(connection.close)
+        self.request(connection, "POST", "/render", b"# Hi")
+        with open(self.template, "w") as f:
+            f.write("<h2>{{ Title }}</h2>")
+        os.utime(self.template, ns=(1, 1))
+        self.assertEqual(
+            self.request(connection, "POST", "/render", b"# Hi"), (200, "<h2>Hi</h2>")
+        )
+
+    def test_unix_socket(self):
+        path = os.path.join(self.root, "render.sock")
+        self.serve(socket_path=path)
+        connection = UnixHTTPConnection(path)
+        self.addCleanup(connection.close)
+        self.assertEqual(self.request(connection, "GET", "/health"), (200, "ok\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import argparse
+import os
+import tempfile
+import unittest
+
+from src.main import generate_pages
+from src.manifest import BuildManifest, hash_file
+from src.shard import merge_shards, parse_shard, select_shard, shard_manifest_path
+
+
+class TestShard(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.pages = []
+        for i in range(12):
+            path = os.path.join(self.content, "blog" if i % 3 else "", f"p{i}.md")
+            with open(path, "w") as f:
+                f.write(f"# Page {i}\n\n" + "text " * (i * 40 + 1))
+            self.pages.append((path, f"out/p{i}.html"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(value)
+
+    def test_shards_cover_every_page_once(self):
+        for strategy in ("hash", "size"):
+            shards = [select_shard(self.pages, i, 3, strategy) for i in (1, 2, 3)]
+            selected = [page for shard in shards for page in shard]
+            self.assertEqual(sorted(selected), sorted(self.pages), strategy)
+
+        shard = select_shard(self.pages, 2, 3, "size")
+        reordered = select_shard(self.pages[::-1], 2, 3, "size")
+        self.assertEqual(sorted(reordered), sorted(shard))
+        loads = []
+        for i in (1, 2, 3):
+            shard = select_shard(self.pages, i, 3, "size")
+            loads.append(sum(os.path.getsize(src) for src, _ in shard))
+        self.assertLess(max(loads) - min(loads), max(loads) // 5)
+
+    def build_shard(self, index, count, strategy="hash"):
+        dest = os.path.join(self.root, f"shard{index}")
+        manifest = BuildManifest(shard_manifest_path(dest, index, count))
+        manifest.configure(hash_file(self.template), "/")
+        manifest.shard = {
+            "index": index,
+            "count": count,
+            "strategy": strategy,
+            "dest": dest,
+        }
+        generate_pages(
+            self.content,
+            self.template,
+            dest,
+            "/",
+            manifest,
+            shard=(index, count, strategy),
+        )
+        manifest.save()
+        return dest
+
+    def test_merge_combines_shards(self):
+        shard_dirs = [self.build_shard(i, 3) for i in (1, 2, 3)]
+        dest = os.path.join(self.root, "docs")
+        manifest_path = os.path.join(self.root, "manifest.json")
+        merged = merge_shards(shard_dirs, dest, manifest_path)
+
+        self.assertEqual(len(merged.pages), 12)
+        self.assertTrue(os.path.isfile(os.path.join(dest, "blog", "p1.html")))
+        self.assertFalse(any(name.startswith(".shard") for name in os.listdir(dest)))
+
+        manifest = BuildManifest(manifest_path)
+        manifest.configure(hash_file(self.template), "/")
+        stats = generate_pages(self.content, self.template, dest, "/", manifest)
+        self.assertEqual(stats, {})
+
+    def test_merge_validates_shards(self):
+        shard_dirs = [self.build_shard(i, 3) for i in (1, 2, 3)]
+        dest = os.path.join(self.root, "docs")
+        manifest_path = os.path.join(self.root, "manifest.json")
+        with self.assertRaises(ValueError):
+            merge_shards(shard_dirs[:2], dest, manifest_path)
+
+        manifest = BuildManifest(shard_manifest_path(shard_dirs[1], 2, 3))
+        os.remove(next(iter(manifest.pages)))
+        with self.assertRaises(ValueError):
+            merge_shards(shard_dirs, dest, manifest_path)
+        self.assertFalse(os.path.exists(dest))
+
+
+if __name__ == "__main__":
+    unittest.main()
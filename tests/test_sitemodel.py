@@ -0,0 +1,138 @@
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from unittest import TestCase
+
+from src.sitemodel import SiteModel
+
+DAY = 24 * 60 * 60
+
+
+class TestSiteModel(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "site.json")
+        self.site = SiteModel(self.path)
+        self.site.configure("t", "/", "https://example.com/")
+        self.add("index", "Home", 1)
+        self.add("blog/first", "First & Best", 2, "The first <post>.")
+        self.add("blog/second", "Second", 3)
+        self.add("notes/one", "One", 4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, name, title, day, summary="", date=None):
+        self.site.update(
+            os.path.join("docs", f"{name}.html"),
+            os.path.join("content", f"{name}.md"),
+            f"/{name}.html",
+            title,
+            summary,
+            day * DAY,
+            name,
+            date,
+        )
+
+    def test_listings_group_pages_by_directory(self):
+        listings = self.site.listing_directories()
+        blog_dir = os.path.join("docs", "blog")
+        self.assertEqual(set(listings), {blog_dir, os.path.join("docs", "notes")})
+        blog = listings[blog_dir]
+        self.assertEqual([entry["title"] for entry in blog], ["Second", "First & Best"])
+
+        title, html = self.site.listing(blog_dir, blog)
+        self.assertEqual(title, "Blog")
+        self.assertEqual(
+            html,
+            '<div><h1>Blog</h1><ul class="listing">'
+            '<li><a href="/blog/second.html">Second</a></li>'
+            '<li><a href="/blog/first.html">First &amp; Best</a>'
+            "<p>The first &lt;post&gt;.</p></li></ul></div>",
+        )
+
+    def test_index_pages_belong_to_the_parent_directory(self):
+        self.add("blog/index", "Blog", 5)
+        self.add("blog/bundle/index", "Bundle", 6)
+        self.add("contact/index", "Contact", 7)
+        listings = self.site.listing_directories()
+        self.assertEqual(
+            [entry["title"] for entry in listings["docs"]], ["Contact", "Blog"]
+        )
+        self.assertEqual(
+            [entry["title"] for entry in listings[os.path.join("docs", "blog")]],
+            ["Bundle", "Second", "First & Best"],
+        )
+        self.assertEqual(
+            self.site.authored_index(os.path.join("docs", "blog")),
+            os.path.join("docs", "blog", "index.html"),
+        )
+        self.assertIsNone(self.site.authored_index(os.path.join("docs", "notes")))
+
+        channel = ET.fromstring(self.site.feed()).find("channel")
+        self.assertEqual(
+            [item.find("title").text for item in channel.findall("item")],
+            ["Contact", "Bundle", "One", "Second", "First & Best"],
+        )
+        sitemap = self.site.sitemap()
+        self.assertIn("<loc>https://example.com/notes/</loc>", sitemap)
+        self.assertNotIn("<loc>https://example.com/blog/</loc>", sitemap)
+
+        self.site.dirty.clear()
+        self.add("blog/bundle/index", "Bundle 2", 6)
+        self.assertEqual(self.site.dirty, {os.path.join("docs", "blog")})
+
+    def test_sitemap(self):
+        ns = {"s": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+        root = ET.fromstring(self.site.sitemap())
+        urls = {
+            url.find("s:loc", ns).text: url.find("s:lastmod", ns).text
+            for url in root.findall("s:url", ns)
+        }
+        self.assertEqual(urls["https://example.com/index.html"], "1970-01-02")
+        self.assertEqual(urls["https://example.com/blog/"], "1970-01-04")
+        self.assertEqual(len(urls), 6)
+
+    def test_feed_lists_newest_pages_first(self):
+        channel = ET.fromstring(self.site.feed(count=2)).find("channel")
+        self.assertEqual(channel.find("title").text, "Home")
+        self.assertEqual(channel.find("link").text, "https://example.com/")
+        items = channel.findall("item")
+        self.assertEqual(
+            [item.find("link").text for item in items],
+            [
+                "https://example.com/notes/one.html",
+                "https://example.com/blog/second.html",
+            ],
+        )
+        self.assertTrue(items[0].find("pubDate").text.startswith("Mon, 05 Jan 1970"))
+
+    def test_front_matter_dates_order_pages(self):
+        self.add("blog/first", "First", 2, date="1970-01-10")
+        blog = self.site.listing_directories()[os.path.join("docs", "blog")]
+        self.assertEqual([entry["title"] for entry in blog], ["First", "Second"])
+        item = ET.fromstring(self.site.feed()).find("channel/item")
+        self.assertEqual(item.find("title").text, "First")
+        self.assertEqual(item.find("pubDate").text, "Sat, 10 Jan 1970 00:00:00 +0000")
+
+    def test_changes_mark_directories_dirty(self):
+        self.site.save()
+        site = SiteModel(self.path)
+        self.assertEqual(site.pages, self.site.pages)
+        site.configure("t", "/", "https://example.com/")
+        self.assertFalse(site.changed)
+
+        self.site = site
+        self.add("blog/second", "Second", 3)
+        self.assertFalse(site.changed)
+        self.add("blog/second", "Second edition", 3)
+        site.retain(set(site.pages) - {os.path.join("docs", "notes", "one.html")})
+        self.assertTrue(site.changed)
+        self.assertEqual(
+            site.dirty, {os.path.join("docs", "blog"), os.path.join("docs", "notes")}
+        )
+        self.assertTrue(site.is_current(os.path.join("docs", "index.html"), "index"))
+
+        site.dirty.clear()
+        site.configure("t2", "/", "https://example.com/")
+        self.assertEqual(site.dirty, {os.path.join("docs", "blog")})
@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+
+from src.sourcefile import iter_lines, map_source
+
+
+class TestSourceFile(unittest.TestCase):
+    def test_iter_lines_matches_split(self):
+        text = "# Title\n\ncafé ☕ line\r\n\n```\ncode\n```\nlast"
+        data = text.encode("utf-8")
+        for chunk_size in (1, 3, 7, 1 << 18):
+            self.assertEqual(
+                list(iter_lines(data, chunk_size)), text.split("\n"), chunk_size
+            )
+        self.assertEqual(list(iter_lines(b"a\n", 1)), ["a", ""])
+
+    def test_map_source(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "page.md")
+            with open(path, "wb") as f:
+                f.write("# Título\n\nbody\n".encode("utf-8"))
+            with map_source(path) as buffer:
+                self.assertEqual(list(iter_lines(buffer)), ["# Título", "", "body", ""])
+
+            open(path, "w").close()
+            with self.assertRaises(ValueError):
+                with map_source(path):
+                    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
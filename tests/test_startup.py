@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.main import generate_pages
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RENDER_IMPORT_BUDGET_MS = 100
+HEAVY_MODULES = {
+    "asyncio",
+    "concurrent.futures",
+    "multiprocessing",
+    "json",
+    "hashlib",
+    "gzip",
+    "typing",
+}
+
+
+def import_times(*args):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:"):
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+            if self_us.strip().isdigit():
+                times[name.strip()] = int(cumulative_us)
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.content)
+        self.page = os.path.join(self.content, "page.md")
+        with open(self.page, "w") as f:
+            f.write("# Hello\n\nSome **bold** [link](/x)\n\n- a\n- b\n")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><a href="/">{{ Content }}</a>')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_matches_build_output(self):
+        output = os.path.join(self.root, "page.html")
+        subprocess.run(
+            [sys.executable, "-m", "src", "render", self.page, "-o", output]
+            + ["--template", self.template, "--basepath", "/base/"],
+            cwd=ROOT,
+            check=True,
+        )
+        dest = os.path.join(self.root, "docs")
+        os.makedirs(dest)
+        generate_pages(self.content, self.template, dest, "/base/")
+        with open(output) as rendered, open(os.path.join(dest, "page.html")) as built:
+            self.assertEqual(rendered.read(), built.read())
+
+    def test_render_import_budget(self):
+        output = os.path.join(self.root, "page.html")
+        times = import_times("-m", "src", "render", self.page, "-o", output)
+        self.assertEqual(sorted(HEAVY_MODULES & set(times)), [])
+        self.assertLess(times["src.render"] / 1000, RENDER_IMPORT_BUDGET_MS)
+
+    def test_build_defers_asyncio(self):
+        self.assertNotIn("asyncio", import_times("-c", "import src.main"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+from src.compress import Compressor
+from src.staticcontent import LARGE_FILE_SIZE, copy_static_to_public
+
+
+class TestCopyStaticToPublic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_copies_all_files(self):
+        synced = copy_static_to_public(self.static, self.dest)
+        self.assertEqual(
+            synced,
+            {
+                os.path.join(self.dest, "index.css"),
+                os.path.join(self.dest, "images", "a.png"),
+            },
+        )
+        with open(os.path.join(self.dest, "images", "a.png")) as f:
+            self.assertEqual(f.read(), "png")
+
+    def test_sync_skips_unchanged_and_keeps_pages(self):
+        synced = copy_static_to_public(self.static, self.dest)
+        page = os.path.join(self.dest, "index.html")
+        self.write(page, "<html></html>")
+        css = os.path.join(self.dest, "index.css")
+        dst_inode = os.stat(css).st_ino
+
+        copy_static_to_public(self.static, self.dest, clean=False, previous=synced)
+        self.assertEqual(os.stat(css).st_ino, dst_inode)
+        self.assertTrue(os.path.exists(page))
+
+    def test_sync_copies_changed_and_removes_stale(self):
+        synced = copy_static_to_public(self.static, self.dest)
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+
+        synced = copy_static_to_public(
+            self.static, self.dest, clean=False, previous=synced
+        )
+        with open(os.path.join(self.dest, "index.css")) as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images", "a.png")))
+        self.assertEqual(synced, {os.path.join(self.dest, "index.css")})
+
+    def test_link_mode_hardlinks_files(self):
+        copy_static_to_public(self.static, self.dest, link=True)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.static, "index.css"),
+                os.path.join(self.dest, "index.css"),
+            )
+        )
+
+    def test_large_files_are_copied_whole(self):
+        video = os.path.join(self.static, "images", "clip.mp4")
+        data = os.urandom(LARGE_FILE_SIZE + 4097)
+        with open(video, "wb") as f:
+            f.write(data)
+        synced = copy_static_to_public(self.static, self.dest)
+        copied = os.path.join(self.dest, "images", "clip.mp4")
+        with open(copied, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(os.stat(copied).st_mtime_ns, os.stat(video).st_mtime_ns)
+
+        data = data[:LARGE_FILE_SIZE] + b"edited"
+        with open(video, "wb") as f:
+            f.write(data)
+        copy_static_to_public(self.static, self.dest, clean=False, previous=synced)
+        with open(copied, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertFalse(os.path.exists(copied + ".tmp"))
+
+    def test_compress_writes_sidecars_for_text_files(self):
+        css = os.path.join(self.dest, "index.css")
+        png = os.path.join(self.dest, "images", "a.png")
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }\n" * 50)
+        self.write(os.path.join(self.static, "images", "a.png"), "png" * 200)
+        copy_static_to_public(self.static, self.dest)
+
+        compressor = Compressor(["gzip"])
+        copy_static_to_public(
+            self.static, self.dest, clean=False, compressor=compressor, refresh=True
+        )
+        self.assertEqual(compressor.wait(), (1, 1))
+        self.assertTrue(os.path.exists(css + ".gz"))
+        self.assertFalse(os.path.exists(png + ".gz"))
+
+        synced = copy_static_to_public(self.static, self.dest, clean=False)
+        self.assertTrue(os.path.exists(css + ".gz"))
+        copy_static_to_public(
+            self.static, self.dest, clean=False, previous=synced, refresh=True
+        )
+        self.assertFalse(os.path.exists(css + ".gz"))
+
+if __name__ == "__main__":
+    unittest.main()
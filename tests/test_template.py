@@ -0,0 +1,53 @@
+import io
+import unittest
+
+from src.htmlnode import LeafNode, ParentNode
+from src.template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_fills_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{Content}}</main>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>x</p>"}),
+            "<title>Hi</title><main><p>x</p></main>",
+        )
+
+    def test_missing_variable_renders_empty(self):
+        template = Template("<p>{{ Date }}</p>")
+        self.assertEqual(template.render({}), "<p></p>")
+
+    def test_basepath_rewrites_template_attributes(self):
+        template = Template('<link href="/index.css"><img src="/a.png">', "/site/")
+        self.assertEqual(
+            template.render({}), '<link href="/site/index.css"><img src="/site/a.png">'
+        )
+
+    def test_basepath_leaves_content_alone(self):
+        template = Template('<a href="/">home</a>{{ Content }}', "/site/")
+        self.assertEqual(
+            template.render({"Content": '<a href="/x">x</a><code>src="/</code>'}),
+            '<a href="/site/">home</a><a href="/x">x</a><code>src="/</code>',
+        )
+
+    def test_placeholder_in_content_is_not_expanded(self):
+        template = Template("{{ Content }}{{ Title }}")
+        self.assertEqual(
+            template.render({"Content": "{{ Title }}", "Title": "T"}), "{{ Title }}T"
+        )
+
+    def test_write_streams_nodes(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        content = ParentNode("div", [LeafNode("p", "hello")])
+        fp = io.StringIO()
+        template.write(fp, {"Title": "Hi", "Content": content})
+        self.assertEqual(fp.getvalue(), "<title>Hi</title><div><p>hello</p></div>")
+
+    def test_empty_template(self):
+        with self.assertRaises(ValueError):
+            Template("")
+
+
+if __name__ == "__main__":
+    unittest.main()
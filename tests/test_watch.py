@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.watch import InotifyWatcher, Watcher, _inotify, diff_snapshots, snapshot
+
+
+class TestWatch(unittest.TestCase):
+    watcher_class = Watcher
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.page = os.path.join(self.content, "blog", "post.md")
+        self.template = os.path.join(self.root, "template.html")
+        for path in (self.page, self.template):
+            self.write(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text="x"):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def watch(self, paths):
+        watcher = self.watcher_class(paths)
+        self.addCleanup(watcher.close)
+        return watcher
+
+    def poll(self, watcher):
+        changed, removed = watcher.poll()
+        return sorted(changed), sorted(removed)
+
+    def test_snapshot_includes_files_and_directories(self):
+        entries = snapshot([self.content, self.template])
+        self.assertEqual(set(entries), {self.page, self.template})
+
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1)}
+        new = {"a": (2, 1), "c": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), (["a", "c"], ["b"]))
+
+    def test_poll_reports_changes_once(self):
+        watcher = self.watch([self.content, self.template])
+        self.assertEqual(self.poll(watcher), ([], []))
+        os.utime(self.page, ns=(1, 1))
+        os.remove(self.template)
+        self.assertEqual(self.poll(watcher), ([self.page], [self.template]))
+        self.assertEqual(self.poll(watcher), ([], []))
+
+    def test_new_and_removed_directories(self):
+        watcher = self.watch([self.content, self.template])
+        notes = os.path.join(self.content, "notes")
+        os.makedirs(os.path.join(notes, "deep"))
+        note = os.path.join(notes, "deep", "one.md")
+        self.write(note)
+        self.assertEqual(self.poll(watcher), ([note], []))
+        self.write(note, "edited")
+        self.assertEqual(self.poll(watcher), ([note], []))
+        shutil.rmtree(os.path.join(self.content, "blog"))
+        self.assertEqual(self.poll(watcher), ([], [self.page]))
+
+    def test_replaced_template_and_unwatched_neighbours(self):
+        watcher = self.watch([self.content, self.template])
+        self.write(os.path.join(self.root, "other.html"))
+        tmp_path = self.template + ".swp"
+        self.write(tmp_path, "new")
+        os.replace(tmp_path, self.template)
+        self.assertEqual(self.poll(watcher), ([self.template], []))
+
+    def test_set_paths_starts_watching_new_templates(self):
+        alt = os.path.join(self.root, "alt.html")
+        self.write(alt)
+        watcher = self.watch([self.content, self.template])
+        watcher.set_paths([self.content, alt])
+        self.assertEqual(self.poll(watcher), ([], []))
+        os.utime(alt, ns=(1, 1))
+        os.utime(self.template, ns=(1, 1))
+        self.assertEqual(self.poll(watcher), ([alt], []))
+
+
+@unittest.skipIf(_inotify() is None, "inotify is not available")
+class TestInotifyWatch(TestWatch):
+    watcher_class = InotifyWatcher
+
+
+if __name__ == "__main__":
+    unittest.main()